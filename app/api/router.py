@@ -9,6 +9,7 @@ from app.api.v1.forums import router as forums_router
 from app.api.v1.forum.categories import router as forum_categories_router
 from app.api.v1.forum.reply import router as forum_reply_router
 from app.api.v1.pdf import router as pdf_router
+from app.api.v1.recommendations import router as recommendations_router
 
 
 api_router = APIRouter()
@@ -22,4 +23,5 @@ api_router.include_router(onboarding_router, prefix="/onboarding", tags=["onboar
 api_router.include_router(forums_router, prefix="/forums", tags=["forums"])
 api_router.include_router(forum_categories_router, prefix="/forums/categories", tags=["forum-categories"])
 api_router.include_router(forum_reply_router, prefix="/forums", tags=["forum-reply"])
-api_router.include_router(pdf_router, prefix="/pdf", tags=["pdf"])
\ No newline at end of file
+api_router.include_router(pdf_router, prefix="/pdf", tags=["pdf"])
+api_router.include_router(recommendations_router, prefix="/recommendations", tags=["recommendations"])
\ No newline at end of file
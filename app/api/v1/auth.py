@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, exists
 from app.db.database import get_db
 from app.models.user import User
-from app.schemas.user_schema import UserCreate, UserOut, UserUpdate, Token
-from app.core.security import hash_password, verify_password, create_access_token
+from app.schemas.user_schema import UserCreate, UserOut, UserUpdate, RefreshRequest
+from app.core.security import hash_password_async, verify_and_rehash_password_async, create_access_token
+from app.core.deps import invalidate_user, get_current_user
 from app.models.researcher_profile import ResearcherProfile
 from app.models.patient_profile import PatientProfile
+from app.services.refresh_tokens import (
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
+    revoke_user_tokens,
+)
 
 router = APIRouter()
 
@@ -16,7 +23,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     existing = q.scalar_one_or_none()
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    new_user = User(email=user_data.email, hashed_password=hash_password(user_data.password), name=user_data.name, role=user_data.role)
+    new_user = User(email=user_data.email, hashed_password=await hash_password_async(user_data.password), name=user_data.name, role=user_data.role)
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
@@ -27,25 +34,25 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 async def login(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     q = await db.execute(select(User).where(User.email == user_data.email))
     user = q.scalar_one_or_none()
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_rehash_password_async(user_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # stored hash uses a different cost than BCRYPT_ROUNDS; upgrade it transparently
+        user.hashed_password = new_hash
+    refresh_token = issue_refresh_token(db, user.id)
+    await db.commit()
 
     token = create_access_token(user_id=user.id, email=user.email, role=user.role)
 
-    has_onboarded = False
-    if user.role == 1:  # researcher
-        q_profile = await db.execute(select(ResearcherProfile).where(ResearcherProfile.user_id == user.id))
-        profile = q_profile.scalar_one_or_none()
-        has_onboarded = bool(profile)
-    elif user.role == 0:  # patient
-        q_profile = await db.execute(select(PatientProfile).where(PatientProfile.user_id == user.id))
-        profile = q_profile.scalar_one_or_none()
-        has_onboarded = bool(profile)
-
     return {
         "access_token": token,
         "token_type": "Bearer",
-        "has_onboarded": has_onboarded,
+        "refresh_token": refresh_token,
+        # kept in sync by the onboarding handlers, so no profile lookup is needed here
+        "has_onboarded": bool(user.has_onboarded),
         "user": {
             "id": str(user.id),
             "email": user.email,
@@ -55,6 +62,32 @@ async def login(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     }
 
 
+@router.post("/refresh")
+async def refresh(data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    # no bcrypt here: the refresh token is checked with one indexed lookup and rotated
+    user, refresh_token = await rotate_refresh_token(db, data.refresh_token)
+    token = create_access_token(user_id=user.id, email=user.email, role=user.role)
+    return {
+        "access_token": token,
+        "token_type": "Bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    # unknown tokens are ignored so logout stays idempotent
+    await revoke_refresh_token(db, data.refresh_token)
+    return None
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    await revoke_user_tokens(db, current_user.id)
+    await db.commit()
+    return None
+
+
 @router.get("/", response_model=list[UserOut])
 async def list_users(db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User))
@@ -77,6 +110,7 @@ async def update_user(user_id: int, user_data: UserUpdate, db: AsyncSession = De
     user = q.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    old_email = user.email
 
     if user_data.email and user_data.email != user.email:
         q_email = await db.execute(select(User).where(User.email == user_data.email))
@@ -86,14 +120,22 @@ async def update_user(user_id: int, user_data: UserUpdate, db: AsyncSession = De
         user.email = user_data.email
 
     if user_data.password:
-        user.hashed_password = hash_password(user_data.password)
+        user.hashed_password = await hash_password_async(user_data.password)
+        # a new password ends every existing session
+        await revoke_user_tokens(db, user.id)
     if user_data.name is not None:
         user.name = user_data.name
-    if user_data.role is not None:
+    if user_data.role is not None and user_data.role != user.role:
         user.role = user_data.role
+        # has_onboarded tracks the profile of the user's current role
+        profile_model = {1: ResearcherProfile, 0: PatientProfile}.get(user.role)
+        user.has_onboarded = profile_model is not None and bool(
+            await db.scalar(select(exists().where(profile_model.user_id == user.id)))
+        )
 
     await db.commit()
     await db.refresh(user)
+    invalidate_user(user.id, old_email, user.email)
     return user
 
 
@@ -106,4 +148,5 @@ async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(user)
     await db.commit()
+    invalidate_user(user_id, user.email)
     return None
\ No newline at end of file
@@ -1,20 +1,46 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.database import get_db
 from app.models.expert import Expert
-from app.models.user import User
 from app.models.favourite import Favourite
 from app.schemas.expert_schema import ExpertCreate, ExpertOut
-from app.core.deps import check_researcher_role
+from app.core.deps import Principal, check_researcher_role, get_current_researcher, resolve_researcher
+from app.services.favourites import with_favourited, annotate_favourited
+from app.core.response_cache import response_cache
+from app.services.export import export_response
+from app.services.recommendations import index_expert
 
 router = APIRouter()
 
+EXPERTS_CACHE_TTL = 300
+expert_list_adapter = TypeAdapter(list[ExpertOut])
+
 
 @router.get("/", response_model=list[ExpertOut])
-async def list_experts(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Expert))
-    return result.scalars().all()
+async def list_experts(
+    request: Request,
+    include_favourited: bool = False,
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(None),
+):
+    if include_favourited:
+        user = await resolve_researcher(authorization, db)
+        result = await db.execute(with_favourited(select(Expert), Expert, "expert", user.id))
+        return annotate_favourited(result.all())
+
+    async def build():
+        result = await db.execute(select(Expert))
+        return result.scalars().all()
+
+    return await response_cache.respond(request, "experts", EXPERTS_CACHE_TTL, build, expert_list_adapter)
+
+
+@router.get("/export")
+async def export_experts(request: Request, format: Literal["ndjson", "csv"] = "ndjson"):
+    return export_response(request, Expert, ExpertOut, "experts", format)
 
 
 @router.post("/", response_model=ExpertOut)
@@ -30,6 +56,8 @@ async def create_expert(
     db.add(new_expert)
     await db.commit()
     await db.refresh(new_expert)
+    await response_cache.invalidate("experts")
+    index_expert(new_expert)
     return new_expert
 
 
@@ -37,30 +65,8 @@ async def create_expert(
 async def favourite_expert(
     expert_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
     result = await db.execute(select(Expert).where(Expert.id == expert_id))
     expert = result.scalar_one_or_none()
     if not expert:
@@ -87,30 +93,8 @@ async def favourite_expert(
 async def unfavourite_expert(
     expert_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
     q = await db.execute(
         select(Favourite).where(
             Favourite.user_id == user.id,
@@ -131,30 +115,8 @@ async def unfavourite_expert(
 async def get_expert_favourite_status(
     expert_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
     q = await db.execute(
         select(Favourite).where(
             Favourite.user_id == user.id,
@@ -1,52 +1,95 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from app.db.database import get_db
-from app.models.user import User
 from app.models.favourite import Favourite
-from app.core.deps import check_researcher_role
+from app.models.trial import Trial
+from app.models.expert import Expert
+from app.models.publication import Publication
+from app.schemas.trial_schema import TrialOut
+from app.schemas.expert_schema import ExpertOut
+from app.schemas.publication_schema import PublicationOut
+from app.schemas.favourite_schema import FavouriteStatusRequest, FavouriteStatusOut
+from app.core.deps import Principal, get_current_researcher
+from app.services.favourites import favourited_pairs
 
 router = APIRouter()
 
+# content_type -> (model, output schema) used to hydrate favourites
+CONTENT_TYPES = {
+    "trial": (Trial, TrialOut),
+    "expert": (Expert, ExpertOut),
+    "publication": (Publication, PublicationOut),
+}
+
+
+async def _load_content(db: AsyncSession, favs) -> dict:
+    # one batched IN query per content type instead of one fetch per favourite
+    ids_by_type: dict[str, set[int]] = {}
+    for f in favs:
+        ids_by_type.setdefault(f.content_type, set()).add(f.content_id)
+
+    content = {}
+    for content_type, ids in ids_by_type.items():
+        if content_type not in CONTENT_TYPES:
+            continue
+        model, schema = CONTENT_TYPES[content_type]
+        q = await db.execute(select(model).where(model.id.in_(ids)))
+        for obj in q.scalars():
+            content[(content_type, obj.id)] = schema.model_validate(obj).model_dump()
+    return content
+
+
 @router.get("/")
 async def list_user_favourites(
+    limit: int = Query(50, ge=1, le=200),
+    before: datetime | None = Query(None, description="created_at of the last favourite on the previous page"),
+    before_id: int | None = Query(None, description="id of the last favourite on the previous page"),
+    expand: bool = False,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
-    q = await db.execute(select(Favourite).where(Favourite.user_id == user.id))
+    # newest first, keyset-paginated on (created_at, id)
+    query = select(Favourite).where(Favourite.user_id == user.id)
+    if before is not None and before_id is not None:
+        query = query.where(tuple_(Favourite.created_at, Favourite.id) < tuple_(before, before_id))
+    elif before is not None:
+        query = query.where(Favourite.created_at < before)
+    query = query.order_by(Favourite.created_at.desc(), Favourite.id.desc()).limit(limit)
+
+    q = await db.execute(query)
     favs = q.scalars().all()
+    content = await _load_content(db, favs) if expand else {}
 
     # return simple serializable objects
-    return [
-        {
+    items = []
+    for f in favs:
+        item = {
             "id": f.id,
             "content_type": f.content_type,
             "content_id": f.content_id,
             "created_at": f.created_at.isoformat() if f.created_at else None,
         }
-        for f in favs
-    ]
+        if expand:
+            item["content"] = content.get((f.content_type, f.content_id))
+        items.append(item)
+    return items
 
 
+@router.post("/status", response_model=list[FavouriteStatusOut])
+async def get_favourite_statuses(
+    body: FavouriteStatusRequest,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_researcher),
+):
+    pairs = {(item.content_type, item.content_id) for item in body.items}
+    favourited = await favourited_pairs(db, user.id, pairs)
+    return [
+        {
+            "content_type": item.content_type,
+            "content_id": item.content_id,
+            "favourited": (item.content_type, item.content_id) in favourited,
+        }
+        for item in body.items
+    ]
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import List
 
 from app.db.database import get_db
 from app.models.forums_category import ForumCategory
+from app.core.response_cache import response_cache
 
 router = APIRouter()
 
@@ -27,6 +28,10 @@ class CategoryResponse(CategoryBase):
         from_attributes = True
 
 
+CATEGORIES_CACHE_TTL = 600
+category_list_adapter = TypeAdapter(List[CategoryResponse])
+
+
 # ---------- ROUTES ----------
 
 @router.post("/", response_model=CategoryResponse)
@@ -45,14 +50,18 @@ async def create_category(category: CategoryCreate, db: AsyncSession = Depends(g
     db.add(new_category)
     await db.commit()
     await db.refresh(new_category)
+    await response_cache.invalidate("forum_categories")
 
     return new_category
 
 
 @router.get("/", response_model=List[CategoryResponse])
-async def get_all_categories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(ForumCategory))
-    return result.scalars().all()
+async def get_all_categories(request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        result = await db.execute(select(ForumCategory))
+        return result.scalars().all()
+
+    return await response_cache.respond(request, "forum_categories", CATEGORIES_CACHE_TTL, build, category_list_adapter)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
@@ -83,6 +92,7 @@ async def update_category(category_id: int, update: CategoryUpdate, db: AsyncSes
 
     await db.commit()
     await db.refresh(category)
+    await response_cache.invalidate("forum_categories")
 
     return category
 
@@ -100,5 +110,6 @@ async def delete_category(category_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(category)
     await db.commit()
+    await response_cache.invalidate("forum_categories")
 
     return {"message": "Category deleted successfully"}
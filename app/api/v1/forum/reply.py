@@ -1,31 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from typing import List
+from sqlalchemy import select, update, func, tuple_
+from typing import List, Literal
 from datetime import datetime
 
-from app.db.database import get_db
+from app.db.database import get_db, AsyncSessionLocal
+from app.core.pagination import encode_cursor, decode_cursor
 from app.models.forums_reply import ForumReply
 from app.models.forums import ForumPost
 from app.schemas.forums_reply import ReplyCreate, ReplyUpdate, ReplyOut
 
 router = APIRouter(prefix="/posts", tags=["Forum Replies"])
 
+STREAM_BATCH_SIZE = 200
+
+
+def _replies_query(post_id: int, cursor: str | None):
+    query = select(ForumReply).where(ForumReply.post_id == post_id)
+    if cursor:
+        last_ts, last_id = decode_cursor(cursor, datetime, int)
+        query = query.where(tuple_(ForumReply.timestamp, ForumReply.id) > tuple_(last_ts, last_id))
+    return query.order_by(ForumReply.timestamp.asc(), ForumReply.id.asc())
+
+
+async def _stream_replies(query):
+    # own session: the generator outlives the request handler
+    async with AsyncSessionLocal() as session:
+        rows = await session.stream_scalars(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for reply in rows:
+            yield ReplyOut.model_validate(reply).model_dump_json() + "\n"
+
+
 @router.get("/{post_id}/replies", response_model=List[ReplyOut])
-async def get_replies(post_id: int, db: AsyncSession = Depends(get_db)):
+async def get_replies(
+    post_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="X-Next-Cursor header from the previous page"),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_db),
+):
     # ensure post exists (optional)
-    post = await db.get(ForumPost, post_id)
-    if not post:
+    exists = await db.scalar(select(ForumPost.id).where(ForumPost.id == post_id))
+    if exists is None:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    result = await db.execute(select(ForumReply).where(ForumReply.post_id == post_id).order_by(ForumReply.timestamp.asc()))
+    query = _replies_query(post_id, cursor)
+    if format == "ndjson":
+        # whole thread from the cursor on, one reply per line, read off a server-side cursor
+        return StreamingResponse(_stream_replies(query), media_type="application/x-ndjson")
+
+    result = await db.execute(query.limit(limit))
     replies = result.scalars().all()
+    if len(replies) == limit:
+        last = replies[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.timestamp, last.id)
     return replies
 
 @router.post("/{post_id}/replies", response_model=ReplyOut, status_code=status.HTTP_201_CREATED)
 async def create_reply(post_id: int, body: ReplyCreate, db: AsyncSession = Depends(get_db)):
-    post = await db.get(ForumPost, post_id)
-    if not post:
+    now = datetime.utcnow()
+
+    # increment post.replies in a single atomic UPDATE; no rows means the post doesn't exist
+    result = await db.execute(
+        update(ForumPost)
+        .where(ForumPost.id == post_id)
+        .values(replies=func.coalesce(ForumPost.replies, 0) + 1, last_activity_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Post not found")
 
     new_reply = ForumReply(
@@ -33,17 +77,13 @@ async def create_reply(post_id: int, body: ReplyCreate, db: AsyncSession = Depen
         author=body.author,
         role=body.role,
         content=body.content,
-        timestamp=datetime.utcnow()
+        timestamp=now
     )
 
     db.add(new_reply)
 
-    # increment post.replies count
-    post.replies = (post.replies or 0) + 1
-
     await db.commit()
     await db.refresh(new_reply)
-    # optional: refresh post if you want to return it elsewhere
     return new_reply
 
 @router.put("/{post_id}/replies/{reply_id}", response_model=ReplyOut)
@@ -67,17 +107,18 @@ async def edit_reply(post_id: int, reply_id: int, body: ReplyUpdate, db: AsyncSe
 
 @router.delete("/{post_id}/replies/{reply_id}")
 async def delete_reply(post_id: int, reply_id: int, db: AsyncSession = Depends(get_db)):
-    post = await db.get(ForumPost, post_id)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-
     reply = await db.get(ForumReply, reply_id)
     if not reply or reply.post_id != post_id:
         raise HTTPException(status_code=404, detail="Reply not found")
 
-    # delete reply and decrement post.replies
+    # delete reply and decrement post.replies atomically, never below zero
     await db.delete(reply)
-    post.replies = max((post.replies or 1) - 1, 0)
+    await db.execute(
+        update(ForumPost)
+        .where(ForumPost.id == post_id, ForumPost.replies > 0)
+        .values(replies=ForumPost.replies - 1)
+        .execution_options(synchronize_session=False)
+    )
 
     await db.commit()
     return {"message": "Reply deleted successfully"}
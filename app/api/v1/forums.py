@@ -1,28 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, tuple_, func
+from typing import List, Literal
 from datetime import datetime
 
 from app.db.database import get_db
 from app.models.forums import ForumPost
 from app.models.forums_category import ForumCategory
-from app.schemas.forums import ForumPostCreate, ForumPostUpdate, ForumPostOut
+from app.schemas.forums import ForumPostCreate, ForumPostUpdate, ForumPostOut, ForumCategoryOut
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.response_cache import response_cache
 
 router = APIRouter()
 
+CATEGORIES_CACHE_TTL = 600
+category_list_adapter = TypeAdapter(List[ForumCategoryOut])
+
 @router.post("/posts", response_model=ForumPostOut)
 async def create_post(post: ForumPostCreate, db: AsyncSession = Depends(get_db)):
-    new_post = ForumPost(**post.dict(), timestamp=datetime.utcnow())
+    now = datetime.utcnow()
+    new_post = ForumPost(**post.dict(), timestamp=now, last_activity_at=now)
     db.add(new_post)
     await db.commit()
     await db.refresh(new_post)
     return new_post
 
+# sort mode -> (key expression, the same key computed from a loaded post, cursor value type);
+# every mode breaks ties on id. Nullable keys are coalesced identically in SQL and in
+# the cursor so a NULL never reaches the tuple comparison or decode_cursor.
+POST_SORTS = {
+    "newest": (ForumPost.timestamp, lambda post: post.timestamp, datetime),
+    "replies": (func.coalesce(ForumPost.replies, 0), lambda post: post.replies or 0, int),
+    # posts written without last_activity_at (e.g. by an older worker) count as active when posted
+    "active": (
+        func.coalesce(ForumPost.last_activity_at, ForumPost.timestamp),
+        lambda post: post.last_activity_at or post.timestamp,
+        datetime,
+    ),
+}
+
 @router.get("/posts", response_model=List[ForumPostOut])
-async def get_posts(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(ForumPost))
+async def get_posts(
+    response: Response,
+    category_id: int | None = None,
+    sort: Literal["newest", "replies", "active"] = "newest",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="X-Next-Cursor header from the previous page"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Keyset-paginated posts. "newest" is stable across pages. "replies" and "active" page on
+    values that change as people reply, so a post that moves while a client is paging can
+    be skipped or repeated: treat those orderings as approximate.
+    """
+    key, key_of, key_type = POST_SORTS[sort]
+    query = select(ForumPost)
+    if category_id is not None:
+        query = query.where(ForumPost.category_id == category_id)
+    if cursor:
+        last_key, last_id = decode_cursor(cursor, key_type, int)
+        query = query.where(tuple_(key, ForumPost.id) < tuple_(last_key, last_id))
+    query = query.order_by(key.desc(), ForumPost.id.desc()).limit(limit)
+
+    result = await db.execute(query)
     posts = result.scalars().all()
+    if len(posts) == limit:
+        last = posts[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(key_of(last), last.id)
     return posts
 
 @router.get("/posts/{post_id}", response_model=ForumPostOut)
@@ -52,8 +97,10 @@ async def delete_post(post_id: int, db: AsyncSession = Depends(get_db)):
     await db.commit()
     return {"message": f"Post {post_id} deleted successfully."}
 
-@router.get("/categories")
-async def get_categories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(ForumCategory))
-    categories = result.scalars().all()
-    return categories
+@router.get("/categories", response_model=List[ForumCategoryOut])
+async def get_categories(request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        result = await db.execute(select(ForumCategory))
+        return result.scalars().all()
+
+    return await response_cache.respond(request, "forum_categories", CATEGORIES_CACHE_TTL, build, category_list_adapter)
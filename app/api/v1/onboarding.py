@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.database import get_db
 from app.models.user import User
-from app.models.researcher_profile import ResearcherProfile
+from app.models.researcher_profile import ResearcherProfile, ResearcherProfileTag, normalize_tag
 from app.models.patient_profile import PatientProfile
 from app.schemas.onboarding_schema import (
     ResearcherProfileCreate, 
@@ -11,27 +11,17 @@ from app.schemas.onboarding_schema import (
     PatientProfileCreate,
     PatientProfileUpdate
 )
-from app.core.security import decode_access_token
-from fastapi.security import HTTPBearer
+from app.core.deps import get_current_user
 
 router = APIRouter()
-security = HTTPBearer()
 
-# --- Helper ---
-async def get_current_user(token: str = Depends(security), db: AsyncSession = Depends(get_db)) -> User:
-    payload = decode_access_token(token.credentials)
-    if not payload:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user_id = payload.get("userId")
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-
-    q = await db.execute(select(User).where(User.id == user_id))
-    user = q.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return user
+def _researcher_profile_out(profile: ResearcherProfile, include_user_id: bool = True) -> dict:
+    out = {"id": profile.id}
+    if include_user_id:
+        out["user_id"] = profile.user_id
+    out.update(condition=profile.condition, location=profile.location, tags=profile.tags)
+    return out
 
 
 # --- Researcher onboarding ---
@@ -48,12 +38,12 @@ async def create_researcher_profile(
         user_id=current_user.id,
         condition=profile_data.condition,
         location=profile_data.location,
-        tags=",".join(profile_data.tags or [])
     )
+    profile.set_tags(profile_data.tags)
     db.add(profile)
+    current_user.has_onboarded = True
     await db.commit()
-    await db.refresh(profile)
-    return {"message": "Researcher onboarding completed", "profile": profile}
+    return {"message": "Researcher onboarding completed", "profile": _researcher_profile_out(profile)}
 
 
 @router.get("/researcher")
@@ -69,12 +59,7 @@ async def get_researcher_profile(
     if not profile:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Researcher profile not found")
     
-    return {
-        "id": profile.id,
-        "condition": profile.condition,
-        "location": profile.location,
-        "tags": profile.tags.split(",") if profile.tags else []
-    }
+    return _researcher_profile_out(profile, include_user_id=False)
 
 
 @router.get("/researcher/{profile_id}")
@@ -88,13 +73,7 @@ async def get_researcher_profile_by_id(
     if not profile:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Researcher profile not found")
     
-    return {
-        "id": profile.id,
-        "user_id": profile.user_id,
-        "condition": profile.condition,
-        "location": profile.location,
-        "tags": profile.tags.split(",") if profile.tags else []
-    }
+    return _researcher_profile_out(profile)
 
 
 @router.put("/researcher")
@@ -119,11 +98,32 @@ async def update_researcher_profile(
     if profile_data.location is not None:
         profile.location = profile_data.location
     if profile_data.tags is not None:
-        profile.tags = ",".join(profile_data.tags) if profile_data.tags else None
+        profile.set_tags(profile_data.tags)
     
     await db.commit()
-    await db.refresh(profile)
-    return {"message": "Researcher profile updated", "profile": profile}
+    return {"message": "Researcher profile updated", "profile": _researcher_profile_out(profile)}
+
+
+@router.get("/researchers")
+async def list_researchers_by_tag(
+    tag: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=200),
+    after: int | None = Query(None, description="Return profiles with id greater than this cursor"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # case- and whitespace-insensitive tag match, keyset-paginated on profile id
+    query = (
+        select(ResearcherProfile)
+        .join(ResearcherProfileTag, ResearcherProfileTag.profile_id == ResearcherProfile.id)
+        .where(ResearcherProfileTag.normalized == normalize_tag(tag))
+    )
+    if after is not None:
+        query = query.where(ResearcherProfileTag.profile_id > after)
+    query = query.order_by(ResearcherProfileTag.profile_id).limit(limit)
+
+    q = await db.execute(query)
+    return [_researcher_profile_out(profile) for profile in q.scalars()]
 
 
 # --- Patient onboarding ---
@@ -142,6 +142,7 @@ async def create_patient_profile(
         location=profile_data.location
     )
     db.add(profile)
+    current_user.has_onboarded = True
     await db.commit()
     await db.refresh(profile)
     return {"message": "Patient onboarding completed", "profile": profile}
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException
-import httpx
-import json
-import re
-from app.schemas.pdf_schema import PDFExtractRequest, PDFExtractResponse
-from app.core.config import settings
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_db
+from app.models.pdf_job import PdfJob
+from app.schemas.pdf_schema import PDFExtractRequest, PDFExtractResponse, PDFJobOut
+from app.services.pdf_extraction import ExtractionError, ModelLoadingError
+from app.services.pdf_cache import extraction_cache
+from app.services.pdf_chunking import extract_document, stream_document
+from app.services.pdf_jobs import pdf_job_queue, QueueFullError
 
 router = APIRouter()
 
@@ -13,80 +17,66 @@ async def extract_pdf_metadata(request: PDFExtractRequest):
     Extract metadata using HuggingFace Router API (hf-inference).
     """
 
-    api_key = settings.HUGGINGFACE_API_KEY
-    if not api_key:
-        raise HTTPException(
-            status_code=500,
-            detail="Hugging Face API key not configured."
-        )
-
-    url = f"https://router.huggingface.co/hf-inference/models/{request.model}"
-
-    payload = {
-        "inputs": request.prompt + "\n\nPDF TEXT:\n" + request.text,
-        "parameters": {
-            "max_new_tokens": 1500,
-            "temperature": 0.1,
-            "return_full_text": False,
-            "top_p": 0.95,
-        }
-    }
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-
     try:
-        async with httpx.AsyncClient(timeout=80.0) as client:
-            response = await client.post(url, headers=headers, json=payload)
-
-        # ✔ HF router returns 503 when model is loading
-        if response.status_code == 503:
-            err = response.json()
-            return PDFExtractResponse(
-                error=err.get("error", "Model is loading"),
-                estimated_time=err.get("estimated_time")
-            )
-
-        if not response.is_success:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Hugging Face API error: {response.text}"
-            )
-
-        data = response.json()
-
-        # --- Parse output ---
-        generated = ""
-        if isinstance(data, list) and len(data) > 0:
-            generated = data[0].get("generated_text", "") or data[0].get("text", "")
-        elif isinstance(data, dict):
-            generated = data.get("generated_text", "") or data.get("text", "")
-
-        if not generated:
-            raise HTTPException(
-                status_code=500,
-                detail=f"No generated_text in HF response: {data}"
-            )
-
-        # --- Clean markdown & extract JSON ---
-        cleaned = (
-            generated.replace("```json", "")
-                     .replace("```", "")
-                     .strip()
-        )
-
-        match = re.search(r"\{[\s\S]*\}", cleaned)
-
-        if not match:
-            raise HTTPException(
-                status_code=500,
-                detail=f"No JSON found in model output. Raw: {cleaned[:400]}"
-            )
-
-        metadata = json.loads(match.group(0))
-        return PDFExtractResponse(metadata=metadata)
+        metadata, cached = await extract_document(request.model, request.prompt, request.text)
+        return PDFExtractResponse(metadata=metadata, cached=cached)
+
+    # ✔ HF router returns 503 when model is loading
+    except ModelLoadingError as e:
+        return PDFExtractResponse(error=e.detail, estimated_time=e.estimated_time)
+
+    except ExtractionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Unexpected error: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {e}")
+
+
+def _job_out(job: PdfJob) -> PDFJobOut:
+    return PDFJobOut(
+        id=job.id,
+        status=job.status,
+        attempts=job.attempts or 0,
+        metadata=job.result,
+        error=job.error,
+        estimated_time=job.estimated_time,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+@router.post("/extract-metadata/stream")
+async def stream_pdf_metadata(request: PDFExtractRequest):
+    """
+    Same extraction as /extract-metadata, streamed as NDJSON: one line per finished
+    chunk, then a final line with `done: true` and the merged metadata.
+    """
+    return StreamingResponse(
+        stream_document(request.model, request.prompt, request.text),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/cache/stats")
+async def extraction_cache_stats():
+    return extraction_cache.stats()
+
+
+@router.post("/jobs", response_model=PDFJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def submit_extraction_job(request: PDFExtractRequest):
+    """
+    Queue a metadata extraction; poll GET /pdf/jobs/{job_id} for the result.
+    """
+    try:
+        job = await pdf_job_queue.submit(request.model, request.prompt, request.text)
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Extraction queue is full, try again later")
+    return _job_out(job)
+
+
+@router.get("/jobs/{job_id}", response_model=PDFJobOut)
+async def get_extraction_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    job = await db.get(PdfJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_out(job)
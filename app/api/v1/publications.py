@@ -1,87 +1,118 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from types import SimpleNamespace
+from typing import Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.database import get_db
 from app.models.publication import Publication
-from app.models.user import User
 from app.models.favourite import Favourite
-from app.schemas.publication_schema import PublicationCreate, PublicationOut
-from app.core.deps import check_researcher_role
+from app.schemas.publication_schema import PublicationCreate, PublicationOut, PublicationSearchResult
+from app.core.deps import Principal, get_current_researcher, resolve_researcher
+from app.services.favourites import with_favourited, annotate_favourited
+from app.core.response_cache import response_cache
+from app.services.export import export_response
+from app.schemas.bulk_schema import BulkImportResult
+from app.services.bulk_import import bulk_insert
+from app.services.search import search_publications, index_publication, unindex_publication
+from app.services.recommendations import index_publication_tags, unindex_publication_tags
 
 router = APIRouter()
 
+PUBLICATIONS_CACHE_TTL = 60
+publication_list_adapter = TypeAdapter(list[PublicationOut])
+
 
 @router.get("/", response_model=list[PublicationOut])
-async def list_publications(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Publication))
-    return result.scalars().all()
+async def list_publications(
+    request: Request,
+    include_favourited: bool = False,
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(None),
+):
+    if include_favourited:
+        user = await resolve_researcher(authorization, db)
+        result = await db.execute(with_favourited(select(Publication), Publication, "publication", user.id))
+        return annotate_favourited(result.all())
+
+    async def build():
+        result = await db.execute(select(Publication))
+        return result.scalars().all()
+
+    return await response_cache.respond(request, "publications", PUBLICATIONS_CACHE_TTL, build, publication_list_adapter)
+
+
+@router.get("/export")
+async def export_publications(request: Request, format: Literal["ndjson", "csv"] = "ndjson"):
+    return export_response(request, Publication, PublicationOut, "publications", format)
+
+
+@router.get("/search", response_model=PublicationSearchResult)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    total, hits = await search_publications(db, q, limit=limit, offset=offset)
+    return {
+        "query": q,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "results": [
+            {"publication": pub, "score": score, "snippet": snippet}
+            for pub, score, snippet in hits
+        ],
+    }
 
 
 @router.post("/", response_model=PublicationOut)
 async def create_publication(
     publication_data: PublicationCreate,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # Extract user_id from token payload
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-
     pub_dict = publication_data.dict(exclude_unset=True)
     pub_dict["user_id"] = user.id
     new_pub = Publication(**pub_dict)
     db.add(new_pub)
     await db.commit()
     await db.refresh(new_pub)
+    index_publication(new_pub)
+    index_publication_tags(new_pub)
+    await response_cache.invalidate("publications")
     return new_pub
 
 
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_create_publications(
+    request: Request,
+    all_or_nothing: bool = False,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_researcher),
+):
+    """
+    Import publications from a JSON array, NDJSON (application/x-ndjson) or CSV (text/csv) body.
+    In CSV, the tags field is a JSON-encoded cell.
+    """
+    result = await bulk_insert(request, db, Publication, PublicationCreate, user.id, all_or_nothing=all_or_nothing)
+    empty = {column.key: None for column in Publication.__table__.columns}
+    for pub_id, values in zip(result["ids"], result.pop("rows")):
+        pub = SimpleNamespace(**{**empty, **values, "id": pub_id})
+        index_publication(pub)
+        index_publication_tags(pub)
+    if result["inserted"]:
+        await response_cache.invalidate("publications")
+    return result
+
+
 @router.delete("/{publication_id}")
 async def delete_publication(
     publication_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # Extract user_id from token payload
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-
     result = await db.execute(select(Publication).where(Publication.id == publication_id))
     publication = result.scalar_one_or_none()
     if not publication:
@@ -96,6 +127,9 @@ async def delete_publication(
 
     await db.delete(publication)
     await db.commit()
+    unindex_publication(publication_id)
+    unindex_publication_tags(publication_id)
+    await response_cache.invalidate("publications")
     return {"message": "Publication deleted successfully"}
 
 
@@ -103,30 +137,8 @@ async def delete_publication(
 async def favourite_publication(
     publication_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
     result = await db.execute(select(Publication).where(Publication.id == publication_id))
     pub = result.scalar_one_or_none()
     if not pub:
@@ -153,30 +165,8 @@ async def favourite_publication(
 async def unfavourite_publication(
     publication_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
     q = await db.execute(
         select(Favourite).where(
             Favourite.user_id == user.id,
@@ -197,30 +187,8 @@ async def unfavourite_publication(
 async def get_publication_favourite_status(
     publication_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
     q = await db.execute(
         select(Favourite).where(
             Favourite.user_id == user.id,
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.db.database import get_db
+from app.models.researcher_profile import ResearcherProfile
+from app.schemas.recommendation_schema import RecommendationsOut
+from app.core.deps import Principal, get_current_researcher
+from app.services.recommendations import recommend
+
+router = APIRouter()
+
+
+@router.get("/", response_model=RecommendationsOut)
+async def get_recommendations(
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_researcher),
+):
+    """Experts and publications ranked by overlap with the researcher's condition and profile tags."""
+    q = await db.execute(select(ResearcherProfile).where(ResearcherProfile.user_id == user.id))
+    profile = q.scalar_one_or_none()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Researcher profile not found")
+
+    experts, publications = await recommend(db, profile.condition, profile.tags, limit)
+    return {
+        "experts": [
+            {"expert": expert, "score": score, "matched_tags": matched}
+            for expert, score, matched in experts
+        ],
+        "publications": [
+            {"publication": pub, "score": score, "matched_tags": matched}
+            for pub, score, matched in publications
+        ],
+    }
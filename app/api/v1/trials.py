@@ -1,49 +1,109 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from types import SimpleNamespace
+from typing import Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.database import get_db
 from app.models.trial import Trial
-from app.models.user import User
 from app.models.favourite import Favourite
-from app.schemas.trial_schema import TrialCreate, TrialOut
-from app.core.deps import check_researcher_role
+from app.models.user import User
+from app.models.patient_profile import PatientProfile
+from app.schemas.trial_schema import TrialCreate, TrialOut, TrialMatch
+from app.core.deps import Principal, get_current_researcher, get_current_user, resolve_researcher
+from app.services.favourites import with_favourited, annotate_favourited
+from app.core.response_cache import response_cache
+from app.services.export import export_response
+from app.schemas.bulk_schema import BulkImportResult
+from app.services.bulk_import import bulk_insert
+from app.services.trial_matching import trial_match_index, index_trial, unindex_trial
 
 router = APIRouter()
 
+TRIALS_CACHE_TTL = 60
+trial_list_adapter = TypeAdapter(list[TrialOut])
+
 @router.get("/", response_model=list[TrialOut])
-async def list_trials(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Trial))
-    return result.scalars().all()
+async def list_trials(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    after: int | None = Query(None, description="Return trials with id greater than this cursor"),
+    recruiting: bool | None = None,
+    phase: str | None = None,
+    status: str | None = None,
+    location: str | None = None,
+    institution: str | None = None,
+    include_favourited: bool = False,
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(None),
+):
+    # keyset pagination on Trial.id: pass the last id of a page as `after` to get the next one
+    query = select(Trial)
+    if after is not None:
+        query = query.where(Trial.id > after)
+    if recruiting is not None:
+        query = query.where(Trial.recruiting == recruiting)
+    if phase is not None:
+        query = query.where(Trial.phase == phase)
+    if status is not None:
+        query = query.where(Trial.status == status)
+    if location is not None:
+        query = query.where(Trial.location == location)
+    if institution is not None:
+        query = query.where(Trial.institution == institution)
+
+    query = query.order_by(Trial.id.asc()).limit(limit)
+    if include_favourited:
+        user = await resolve_researcher(authorization, db)
+        result = await db.execute(with_favourited(query, Trial, "trial", user.id))
+        return annotate_favourited(result.all())
+
+    async def build():
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    return await response_cache.respond(request, "trials", TRIALS_CACHE_TTL, build, trial_list_adapter)
+
+
+@router.get("/matches", response_model=list[TrialMatch])
+async def match_trials(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != 0:
+        raise HTTPException(status_code=403, detail="Only patients can access this route")
+
+    q = await db.execute(select(PatientProfile).where(PatientProfile.user_id == current_user.id))
+    profile = q.scalar_one_or_none()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Patient profile not found")
+
+    await trial_match_index.ensure_fresh()
+    ranked = trial_match_index.match(profile.condition, profile.location, limit)
+    if not ranked:
+        return []
+
+    result = await db.execute(select(Trial).where(Trial.id.in_([trial_id for trial_id, _, _ in ranked])))
+    trials = {t.id: t for t in result.scalars()}
+    return [
+        {"trial": trials[trial_id], "score": score, "matched_terms": terms}
+        for trial_id, score, terms in ranked
+        if trial_id in trials
+    ]
+
+
+@router.get("/export")
+async def export_trials(request: Request, format: Literal["ndjson", "csv"] = "ndjson"):
+    return export_response(request, Trial, TrialOut, "trials", format)
 
 
 @router.post("/", response_model=TrialOut)
 async def create_trial(
     trial_data: TrialCreate,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # Extract user_id from token payload
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-
     # Use model-compatible dict (exclude unset to allow DB defaults)
     trial_dict = trial_data.model_dump(exclude_unset=True)
     trial_dict["user_id"] = user.id
@@ -51,38 +111,39 @@ async def create_trial(
     db.add(new_trial)
     await db.commit()
     await db.refresh(new_trial)
+    await response_cache.invalidate("trials")
+    index_trial(new_trial)
     return new_trial
 
 
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_create_trials(
+    request: Request,
+    all_or_nothing: bool = False,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_researcher),
+):
+    """
+    Import trials from a JSON array, NDJSON (application/x-ndjson) or CSV (text/csv) body.
+    In CSV, list and object fields (eligibility, contact) are JSON-encoded cells.
+    """
+    result = await bulk_insert(request, db, Trial, TrialCreate, user.id, all_or_nothing=all_or_nothing)
+    empty = {column.key: None for column in Trial.__table__.columns}
+    for trial_id, values in zip(result["ids"], result.pop("rows")):
+        # recruiting falls back to the column default (False) when a row leaves it out
+        index_trial(SimpleNamespace(**{**empty, "recruiting": False, **values, "id": trial_id}))
+    if result["inserted"]:
+        await response_cache.invalidate("trials")
+    return result
+
+
 @router.put("/{trial_id}", response_model=TrialOut)
 async def update_trial(
     trial_id: int,
     trial_data: TrialCreate,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # Extract user_id from token payload
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-
     result = await db.execute(select(Trial).where(Trial.id == trial_id))
     trial = result.scalar_one_or_none()
     if not trial:
@@ -100,6 +161,8 @@ async def update_trial(
 
     await db.commit()
     await db.refresh(trial)
+    await response_cache.invalidate("trials")
+    index_trial(trial)
     return trial
 
 
@@ -107,30 +170,8 @@ async def update_trial(
 async def delete_trial(
     trial_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # Extract user_id from token payload
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-
     result = await db.execute(select(Trial).where(Trial.id == trial_id))
     trial = result.scalar_one_or_none()
     if not trial:
@@ -145,6 +186,8 @@ async def delete_trial(
 
     await db.delete(trial)
     await db.commit()
+    await response_cache.invalidate("trials")
+    unindex_trial(trial_id)
     return {"message": "Trial deleted successfully"}
 
 
@@ -153,30 +196,8 @@ async def delete_trial(
 async def favourite_trial(
     trial_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
     result = await db.execute(select(Trial).where(Trial.id == trial_id))
     trial = result.scalar_one_or_none()
     if not trial:
@@ -204,30 +225,8 @@ async def favourite_trial(
 async def unfavourite_trial(
     trial_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
     q = await db.execute(
         select(Favourite).where(
             Favourite.user_id == user.id,
@@ -248,30 +247,8 @@ async def unfavourite_trial(
 async def get_trial_favourite_status(
     trial_id: int,
     db: AsyncSession = Depends(get_db),
-    authorization: str = Header(None),
+    user: Principal = Depends(get_current_researcher),
 ):
-    token = authorization.split(" ")[1] if authorization else None
-    payload = check_researcher_role(token)
-
-    # resolve researcher user by preferring `email`, then `userId`, then `sub`.
-    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
-    user = None
-    if sub is not None:
-        if isinstance(sub, str) and "@" in sub:
-            q = await db.execute(select(User).where(User.email == sub))
-            user = q.scalar_one_or_none()
-        else:
-            try:
-                user_id = int(sub)
-                q = await db.execute(select(User).where(User.id == user_id))
-                user = q.scalar_one_or_none()
-            except (ValueError, TypeError):
-                q = await db.execute(select(User).where(User.email == str(sub)))
-                user = q.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Researcher not found")
-
     q = await db.execute(
         select(Favourite).where(
             Favourite.user_id == user.id,
@@ -10,8 +10,54 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # a spent refresh token presented again within this window is a concurrent refresh
+    # (two tabs, a retry), not a stolen token
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 10
     RESEARCHER_ROLE: int = 2
     HUGGINGFACE_API_KEY: str | None = None
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_MAX_SIZE: int = 1024
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_SSL: bool = True
+    # None = auto: NullPool when running on Vercel (VERCEL env var is set)
+    DB_NULL_POOL: bool | None = None
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_REDIS_URL: str | None = None
+    PDF_JOB_WORKERS: int = 2
+    PDF_JOB_QUEUE_SIZE: int = 100
+    PDF_JOB_MAX_ATTEMPTS: int = 5
+    # a job still "running" this long after its last update is assumed orphaned by a dead worker
+    PDF_JOB_LEASE_SECONDS: int = 900
+    PDF_CACHE_MEMORY_ENTRIES: int = 256
+    PDF_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    PDF_CACHE_DB_MAX_ENTRIES: int = 10000
+    PDF_CHUNK_TOKENS: int = 3000
+    PDF_CHUNK_CONCURRENCY: int = 4
+    BULK_IMPORT_MAX_ROWS: int = 50000
+    TRIAL_MATCH_REFRESH_SECONDS: int = 300
+    RECOMMENDATION_REFRESH_SECONDS: int = 300
+    HTTP_HTTP2: bool = True
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_MAX_CONCURRENCY_PER_HOST: int = 8
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS_URL: str | None = None
+    RATE_LIMIT_MAX_KEYS: int = 10000
+    # enable only behind a proxy that appends to X-Forwarded-For (e.g. Vercel); the
+    # client address is then the entry RATE_LIMIT_PROXY_HOPS from the right
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    RATE_LIMIT_PROXY_HOPS: int = 1
 
     model_config = SettingsConfigDict(env_file=str(ENV_PATH), env_file_encoding='utf-8')
 
@@ -1,11 +1,19 @@
-from fastapi import Depends, HTTPException, status
-from jose import jwt, JWTError
+from dataclasses import dataclass
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.security import HTTPBearer
+from jose import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.security import verify_token, decode_access_token
+from app.db.database import get_db
+from app.models.user import User
 
 def check_researcher_role(token: str = Depends(...)):
     try:
         # Decode JWT
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        payload = verify_token(token)
 
         # Extract role from payload
         role = payload.get("role")
@@ -39,3 +47,85 @@ def check_researcher_role(token: str = Depends(...)):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    role: int
+    name: str | None = None
+
+
+# token subject (email or user id, as a string) -> Principal
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: int, *emails: str | None) -> None:
+    user_cache.pop(str(user_id))
+    for email in emails:
+        if email:
+            user_cache.pop(email)
+
+
+async def _load_principal(sub, db: AsyncSession) -> Principal | None:
+    # resolve by `email` when the subject looks like one, otherwise by user id
+    if isinstance(sub, str) and "@" in sub:
+        query = select(User).where(User.email == sub)
+    else:
+        try:
+            query = select(User).where(User.id == int(sub))
+        except (ValueError, TypeError):
+            query = select(User).where(User.email == str(sub))
+
+    q = await db.execute(query)
+    user = q.scalar_one_or_none()
+    if not user:
+        return None
+    return Principal(id=user.id, email=user.email, role=user.role, name=user.name)
+
+
+async def resolve_researcher(authorization: str | None, db: AsyncSession) -> Principal:
+    token = authorization.split(" ")[1] if authorization and " " in authorization else None
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    payload = check_researcher_role(token)
+
+    # prefer `email`, then `userId`, then `sub`, as the per-route lookups used to
+    sub = payload.get("email") or payload.get("userId") or payload.get("sub")
+    if sub is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Researcher not found")
+
+    key = str(sub)
+    principal = user_cache.get(key)
+    if principal is None:
+        principal = await _load_principal(sub, db)
+        if principal is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Researcher not found")
+        user_cache.set(key, principal)
+    return principal
+
+
+async def get_current_researcher(
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    return await resolve_researcher(authorization, db)
+
+
+security = HTTPBearer()
+
+async def get_current_user(token: str = Depends(security), db: AsyncSession = Depends(get_db)) -> User:
+    payload = decode_access_token(token.credentials)
+    if not payload:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+    user_id = payload.get("userId")
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+
+    q = await db.execute(select(User).where(User.id == user_id))
+    user = q.scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
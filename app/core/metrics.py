@@ -0,0 +1,201 @@
+import logging
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+# the same SELECT run with this many different parameter sets in one request is
+# reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class CounterMetric:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, labels)} {_format(value)}")
+        return lines
+
+
+class HistogramMetric:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = (*buckets, float("inf"))
+        # labels -> (per-bucket counts, sum)
+        self._values: dict[tuple, tuple[list[int], float]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        counts, total = self._values.get(labels) or ([0] * len(self.buckets), 0.0)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self._values[labels] = (counts, total + value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="%s"' % _format(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {_format(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+http_requests = CounterMetric("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+http_latency = HistogramMetric(
+    "http_request_duration_seconds", "Time until the response finished.", ("method", "route"), LATENCY_BUCKETS
+)
+db_queries = HistogramMetric(
+    "db_queries_per_request", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+db_time = CounterMetric("db_query_seconds_total", "Time spent in SQL statements.", ("method", "route"))
+n_plus_one = CounterMetric(
+    "db_n_plus_one_total", "Requests that ran one SELECT with at least N_PLUS_ONE_THRESHOLD parameter sets.", ("method", "route")
+)
+
+METRICS = [http_requests, http_latency, db_queries, db_time, n_plus_one]
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    # SELECT text -> distinct parameter sets it ran with
+    selects: dict = field(default_factory=lambda: defaultdict(set))
+
+
+# set per request by TimingMiddleware; SQLAlchemy carries the context into its greenlets
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # the execution context lives for exactly one statement, failed ones included
+    context._timing_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._timing_start
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        # batched writes (executemany, bulk INSERT ... RETURNING) repeat by design
+        if not executemany and not context.executemany and statement.lstrip()[:6].upper() == "SELECT":
+            stats.selects[statement].add(repr(parameters))
+
+
+def instrument_engine(engine) -> None:
+    """Count SQL statements and their time against the current request."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_template(scope) -> str:
+    # templates, not raw paths, keep label cardinality bounded
+    route = scope.get("route")
+    if route is not None and getattr(route, "path_format", None):
+        return route.path_format
+    for route in getattr(scope.get("app"), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path_format", None) or getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+def _server_timing(total: float, stats: RequestStats) -> bytes:
+    return (
+        f'app;dur={total * 1000:.1f}, db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+    ).encode()
+
+
+class TimingMiddleware:
+    """Records per-route latency and SQL usage, and reports them in a Server-Timing header.
+
+    Server-Timing is sent with the response headers, so for streamed responses it
+    covers the work done before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(time.perf_counter() - start, stats)))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            self._record(scope, status, time.perf_counter() - start, stats)
+
+    @staticmethod
+    def _record(scope, status: int, elapsed: float, stats: RequestStats) -> None:
+        method, route = scope["method"], _route_template(scope)
+        http_requests.inc(method, route, str(status))
+        http_latency.observe(elapsed, method, route)
+        db_queries.observe(stats.queries, method, route)
+        db_time.inc(method, route, amount=stats.db_seconds)
+
+        statement, params = max(stats.selects.items(), key=lambda item: len(item[1]), default=(None, ()))
+        repeats = len(params)
+        if repeats >= N_PLUS_ONE_THRESHOLD:
+            n_plus_one.inc(method, route)
+            logger.warning(
+                "Possible N+1 on %s %s: SELECT ran with %d different parameter sets: %s",
+                method, route, repeats, " ".join(statement.split())[:200],
+            )
@@ -0,0 +1,200 @@
+import json
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+from jose import JWTError
+
+from app.core.config import settings
+from app.core.security import verify_token
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Token bucket: `burst` requests at once, refilled at `per_minute` requests per minute."""
+
+    name: str
+    methods: frozenset[str]
+    path: re.Pattern
+    per_minute: float
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60.0
+
+    def matches(self, method: str, path: str) -> bool:
+        return method in self.methods and self.path.match(path) is not None
+
+
+def policy(name: str, methods: str, path: str, per_minute: float, burst: int) -> RateLimitPolicy:
+    return RateLimitPolicy(name, frozenset(methods.split(",")), re.compile(path), per_minute, burst)
+
+
+# first match wins
+DEFAULT_POLICIES = [
+    # bcrypt-bound
+    policy("login", "POST", r"^/api/v1/auth/login$", per_minute=5, burst=5),
+    policy("auth", "POST", r"^/api/v1/auth/(register|refresh)$", per_minute=20, burst=10),
+    # each call is a paid inference request upstream
+    policy("pdf", "POST", r"^/api/v1/pdf/(extract-metadata(/stream)?|jobs)$", per_minute=10, burst=5),
+    policy("export", "GET", r"^/api/v1/(trials|publications|experts)/export$", per_minute=6, burst=3),
+    policy(
+        "list",
+        "GET",
+        r"^/api/v1/("
+        r"(trials|publications|experts|favourites|recommendations)/?"
+        r"|trials/matches|publications/search|onboarding/researchers"
+        r"|forums/posts|forums/posts/\d+/replies"
+        r")$",
+        per_minute=120,
+        burst=60,
+    ),
+]
+
+
+class RateLimitStore(Protocol):
+    async def take(self, key: str, rate: float, burst: int) -> tuple[bool, float]:
+        """Take one token from the bucket; return (allowed, seconds until a token is available)."""
+        ...
+
+
+class MemoryStore:
+    """Per-process buckets; the least recently used ones are dropped beyond `max_keys`."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait == 0.0, wait
+
+
+# runs atomically on the server, using its clock so app instances need not agree on time
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisStore:
+    """Buckets shared by every instance, in any server speaking the Redis protocol (EVAL)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def take(self, key: str, rate: float, burst: int) -> tuple[bool, float]:
+        wait = float(await self.client.eval(_TAKE_SCRIPT, 1, key, rate, burst))
+        return wait == 0.0, wait
+
+
+def _make_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_REDIS_URL:
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the `redis` package is not installed")
+        return RedisStore(redis.from_url(settings.RATE_LIMIT_REDIS_URL))
+    return MemoryStore(settings.RATE_LIMIT_MAX_KEYS)
+
+
+def _header(scope, name: bytes) -> list[str]:
+    return [value.decode("latin-1") for key, value in scope.get("headers") or () if key == name]
+
+
+def _client_address(scope) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        # clients can send any X-Forwarded-For they like; only the entries appended by our
+        # own proxies (the rightmost RATE_LIMIT_PROXY_HOPS) can be trusted
+        hops = [hop.strip() for value in _header(scope, b"x-forwarded-for") for hop in value.split(",") if hop.strip()]
+        if hops:
+            return hops[-min(settings.RATE_LIMIT_PROXY_HOPS, len(hops))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _client_id(scope) -> str:
+    """The caller's user id when it sends a valid bearer token, otherwise its address."""
+    for value in _header(scope, b"authorization"):
+        scheme, _, token = value.partition(" ")
+        if scheme.lower() != "bearer":
+            continue
+        try:
+            user_id = verify_token(token.strip()).get("userId")
+        except JWTError:
+            break
+        if user_id is not None:
+            return f"user:{user_id}"
+    return f"ip:{_client_address(scope)}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying the first matching policy per user, or per address when anonymous."""
+
+    def __init__(self, app, policies: list[RateLimitPolicy] | None = None, store: RateLimitStore | None = None):
+        self.app = app
+        self.policies = DEFAULT_POLICIES if policies is None else policies
+        self.store = store or _make_store()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            return await self.app(scope, receive, send)
+
+        method, path = scope["method"], scope["path"]
+        matched = next((p for p in self.policies if p.matches(method, path)), None)
+        if matched is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            allowed, wait = await self.store.take(f"rl:{matched.name}:{_client_id(scope)}", matched.rate, matched.burst)
+        except Exception:
+            # a broken store must not take the API down with it
+            logger.warning("Rate limit store unavailable; letting request through", exc_info=True)
+            return await self.app(scope, receive, send)
+
+        if allowed:
+            return await self.app(scope, receive, send)
+
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,109 @@
+import hashlib
+from typing import Awaitable, Callable, Protocol
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class CacheBackend(Protocol):
+    # the subset of redis.asyncio.Redis the response cache relies on
+    async def get(self, key: str) -> bytes | None: ...
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None: ...
+    async def incr(self, key: str) -> int: ...
+
+
+class MemoryBackend:
+    """In-process LRU backend; namespace versions live outside the LRU so they are never evicted."""
+
+    def __init__(self, maxsize: int = 512):
+        self._entries = TTLCache(maxsize=maxsize, ttl=60)
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self._entries.set(key, value, ttl=ex)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+def _make_backend() -> CacheBackend:
+    if settings.RESPONSE_CACHE_REDIS_URL:
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_REDIS_URL is set but the `redis` package is not installed")
+        return redis.from_url(settings.RESPONSE_CACHE_REDIS_URL)
+    return MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """Caches serialized JSON bodies per namespace, with ETag revalidation.
+
+    Invalidation bumps a per-namespace version that is part of every key, so a
+    write makes all cached pages of that namespace unreachable in one call.
+    """
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    async def _version(self, namespace: str) -> int:
+        value = await self.backend.get(f"rc:{namespace}:version")
+        return int(value) if value else 0
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            await self.backend.incr(f"rc:{namespace}:version")
+
+    async def _key(self, request: Request, namespace: str) -> str:
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        digest = hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()
+        return f"rc:{namespace}:{await self._version(namespace)}:{digest}"
+
+    @staticmethod
+    def _response(request: Request, etag: str, body: bytes, status: str) -> Response:
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Cache": status}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def respond(
+        self,
+        request: Request,
+        namespace: str,
+        ttl: int,
+        build: Callable[[], Awaitable[object]],
+        adapter: TypeAdapter,
+    ) -> Response:
+        """Serve `build()` serialized through `adapter`, from cache when possible."""
+        key = await self._key(request, namespace) if self.enabled else None
+        if key is not None:
+            cached = await self.backend.get(key)
+            if cached:
+                etag, _, body = cached.partition(b"\n")
+                return self._response(request, etag.decode(), body, "HIT")
+
+        body = adapter.dump_json(adapter.validate_python(await build(), from_attributes=True))
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if key is not None:
+            await self.backend.set(key, etag.encode() + b"\n" + body, ex=ttl)
+        return self._response(request, etag, body, "MISS")
+
+
+response_cache = ResponseCache(_make_backend(), enabled=settings.RESPONSE_CACHE_ENABLED)
@@ -1,9 +1,26 @@
+import asyncio
+import hashlib
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max desired rounds pinned to the configured cost so hashes made with any
+# other work factor are reported as needing an update on the next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_desired_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_desired_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password[:72])
@@ -11,6 +28,18 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password[:72], hashed_password)
 
+def verify_and_rehash_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Return (valid, new_hash); new_hash is set when the stored hash uses an outdated cost."""
+    return pwd_context.verify_and_update(plain_password[:72], hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
+async def verify_and_rehash_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_and_rehash_password, plain_password, hashed_password)
+
 def create_access_token(user_id: int, email: str, role: int | None = None, expires_delta: timedelta | None = None):
     to_encode = {"userId": int(user_id), "email": str(email)}
     if role is not None:
@@ -19,9 +48,35 @@ def create_access_token(user_id: int, email: str, role: int | None = None, expir
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
+def generate_refresh_token() -> str:
+    return secrets.token_urlsafe(48)
+
+def hash_refresh_token(token: str) -> str:
+    # refresh tokens are 384 random bits, so a fast unsalted digest is enough to store them
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# sha256(token) -> verified payload, expiring together with the token itself
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=300)
+
+def verify_token(token: str) -> dict:
+    """Verify and decode a JWT, raising JWTError; verified payloads are cached until `exp`."""
+    if not token:
+        raise JWTError("Missing token")
+
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
+    payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    exp = payload.get("exp")
+    ttl = float(exp) - time.time() if isinstance(exp, (int, float)) else None
+    if ttl is None or ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return dict(payload)
+
 def decode_access_token(token: str):
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload
+        return verify_token(token)
     except JWTError:
         return None
\ No newline at end of file
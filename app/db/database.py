@@ -1,7 +1,11 @@
+import os
 import ssl
+import time
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 Base = declarative_base()
 
@@ -11,9 +15,88 @@ ssl_context.verify_mode = ssl.CERT_NONE
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_async_engine(DATABASE_URL, echo=False, connect_args={"ssl": ssl_context})
+
+class PoolWaitStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.observe(time.perf_counter() - start)
+
+
+def use_null_pool() -> bool:
+    # serverless instances are short-lived and many, so pooled connections only pile up server-side
+    if settings.DB_NULL_POOL is not None:
+        return settings.DB_NULL_POOL
+    return bool(os.environ.get("VERCEL"))
+
+
+def _engine_options() -> dict:
+    connect_args = {}
+    if DATABASE_URL.startswith("postgresql+asyncpg"):
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+        connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+        if settings.DB_SSL:
+            connect_args["ssl"] = ssl_context
+
+    options = {"echo": False, "connect_args": connect_args, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if use_null_pool():
+        options["poolclass"] = NullPool
+    elif not DATABASE_URL.startswith("sqlite"):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return options
+
+
+engine = create_async_engine(DATABASE_URL, **_engine_options())
+instrument_engine(engine)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+
+def pool_status() -> dict:
+    pool = engine.sync_engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+        )
+    # wait times are only recorded by InstrumentedQueuePool; omit them rather than report zeros
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(
+            checkouts=pool_wait_stats.checkouts,
+            wait_seconds_total=round(pool_wait_stats.total_wait, 6),
+            wait_seconds_max=round(pool_wait_stats.max_wait, 6),
+        )
+    return stats
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
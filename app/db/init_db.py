@@ -1,10 +1,12 @@
 import asyncio
 from app.db.database import engine, Base
-from app.models import user, trial, publication, expert, favourite, patient_profile, researcher_profile, forums, forums_category, forums_reply
+from app.db.migrations import run_migrations
+from app.models import user, trial, publication, expert, favourite, patient_profile, researcher_profile, forums, forums_category, forums_reply, pdf_job, pdf_extraction_cache, refresh_token
 
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
     print("DB initialized (tables created)")
 
 if __name__ == "__main__":
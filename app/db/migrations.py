@@ -0,0 +1,107 @@
+# Idempotent schema upgrades for databases created before a model change.
+# `Base.metadata.create_all` only creates missing tables, so new columns, indexes
+# and backfills on existing tables are applied here by `init_db`.
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+
+async def _has_column(conn, table: str, column: str) -> bool:
+    def check(sync_conn):
+        return column in {c["name"] for c in inspect(sync_conn).get_columns(table)}
+    return await conn.run_sync(check)
+
+
+async def _add_column(conn, table: str, column: str, ddl: str) -> None:
+    if not await _has_column(conn, table, column):
+        await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+async def create_missing_indexes(conn) -> None:
+    from app.db.database import Base
+
+    def create(sync_conn):
+        dialect = sync_conn.dialect.name
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                ddl_if = getattr(index, "_ddl_if", None)
+                if ddl_if is not None and ddl_if.dialect and ddl_if.dialect != dialect:
+                    continue
+                # IF NOT EXISTS rather than checkfirst: SQLite cannot reflect expression
+                # indexes, so checkfirst would miss ones create_all has just built
+                sync_conn.execute(CreateIndex(index, if_not_exists=True))
+
+    await conn.run_sync(create)
+
+
+async def forum_post_last_activity(conn) -> None:
+    await _add_column(conn, "forum_posts", "last_activity_at", "TIMESTAMP")
+    await conn.execute(text(
+        "UPDATE forum_posts SET last_activity_at = COALESCE("
+        "(SELECT MAX(r.timestamp) FROM forum_replies r WHERE r.post_id = forum_posts.id), timestamp"
+        ") WHERE last_activity_at IS NULL"
+    ))
+
+
+async def researcher_profile_tags(conn) -> None:
+    # comma-joined researcher_profiles.tags -> one researcher_profile_tags row per tag
+    from app.models.researcher_profile import normalize_tag
+
+    if not await _has_column(conn, "researcher_profiles", "tags"):
+        return
+    result = await conn.execute(text(
+        "SELECT id, tags FROM researcher_profiles WHERE tags IS NOT NULL AND tags <> ''"
+    ))
+    links = []
+    for profile_id, tags in result:
+        seen = set()
+        for tag in tags.split(","):
+            tag = tag.strip()
+            normalized = normalize_tag(tag)
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            links.append({"profile_id": profile_id, "normalized": normalized, "tag": tag, "position": len(seen) - 1})
+    if links:
+        await conn.execute(text(
+            "INSERT INTO researcher_profile_tags (profile_id, normalized, tag, position) "
+            "VALUES (:profile_id, :normalized, :tag, :position)"
+        ), links)
+    await conn.execute(text("ALTER TABLE researcher_profiles DROP COLUMN tags"))
+
+
+async def user_has_onboarded(conn) -> None:
+    # login reads users.has_onboarded instead of probing the profile tables
+    await conn.execute(text(
+        "UPDATE users SET has_onboarded = CASE role "
+        "WHEN 1 THEN EXISTS (SELECT 1 FROM researcher_profiles p WHERE p.user_id = users.id) "
+        "WHEN 0 THEN EXISTS (SELECT 1 FROM patient_profiles p WHERE p.user_id = users.id) "
+        "ELSE FALSE END "
+        "WHERE has_onboarded IS NULL OR has_onboarded = FALSE"
+    ))
+
+
+async def refresh_token_rotation(conn) -> None:
+    await _add_column(conn, "refresh_tokens", "rotated_at", "TIMESTAMP")
+    await _add_column(conn, "refresh_tokens", "replaced_by_id", "INTEGER")
+
+
+async def forum_post_replies_index(conn) -> None:
+    # superseded by ix_forum_posts_replies_coalesced and ix_forum_posts_activity_coalesced,
+    # created by create_missing_indexes
+    await conn.execute(text("DROP INDEX IF EXISTS ix_forum_posts_replies"))
+    await conn.execute(text("DROP INDEX IF EXISTS ix_forum_posts_last_activity"))
+
+
+MIGRATIONS = [
+    forum_post_last_activity,
+    researcher_profile_tags,
+    user_has_onboarded,
+    refresh_token_rotation,
+    forum_post_replies_index,
+]
+
+
+async def run_migrations(conn) -> None:
+    for migration in MIGRATIONS:
+        await migration(conn)
+    await create_missing_indexes(conn)
@@ -1,25 +1,48 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from app.api.router import api_router
+from app.db.database import pool_status
+from app.services.pdf_jobs import pdf_job_queue
+from app.services.http_client import start_http_client, close_http_client
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.metrics import TimingMiddleware, render_metrics
 import datetime
 
-app = FastAPI(title="CuraLink API", version="0.1")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_client()
+    await pdf_job_queue.start()
+    yield
+    await pdf_job_queue.stop()
+    await close_http_client()
+
+
+app = FastAPI(title="CuraLink API", version="0.1", lifespan=lifespan)
 templates = Jinja2Templates(directory="app/template")
 
 origins = [
     "*"
 ]
 
+# added before CORS so that CORS wraps it and 429 responses still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Retry-After", "Server-Timing"],
 )
 
+# outermost, so rate-limited and CORS preflight responses are timed too
+app.add_middleware(TimingMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/", response_class=HTMLResponse)
@@ -33,3 +56,13 @@ async def root(request: Request):
         "version": "1.0.0"
     }
     return templates.TemplateResponse("index.html", context)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/db-pool")
+async def db_pool_metrics():
+    return pool_status()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, func, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, func, UniqueConstraint, Index
 from app.db.database import Base
 
 
@@ -11,4 +11,8 @@ class Favourite(Base):
     content_id = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    __table_args__ = (UniqueConstraint("user_id", "content_type", "content_id", name="uix_user_content"),)
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint("user_id", "content_type", "content_id", name="uix_user_content"),
+        # newest-first keyset pages of a user's favourites
+        Index("ix_favourites_user_created", "user_id", "created_at", "id"),
+    )
\ No newline at end of file
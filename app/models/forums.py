@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Index, func
 from app.db.database import Base
 from datetime import datetime
 from app.models.forums_category import ForumCategory
@@ -14,5 +14,16 @@ class ForumPost(Base):
     replies = Column(Integer, default=0)
     preview = Column(Text)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    # bumped on every new reply; drives the "recently active" ordering
+    last_activity_at = Column(DateTime, default=datetime.utcnow)
 
     category = relationship("ForumCategory", backref="posts")
+
+    __table_args__ = (
+        Index("ix_forum_posts_timestamp", "timestamp", "id"),
+        Index("ix_forum_posts_category_timestamp", "category_id", "timestamp", "id"),
+        # matches the COALESCE the "replies" sort orders and pages on
+        Index("ix_forum_posts_replies_coalesced", func.coalesce(replies, 0), id),
+        # matches the COALESCE the "active" sort orders and pages on
+        Index("ix_forum_posts_activity_coalesced", func.coalesce(last_activity_at, timestamp), id),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -16,3 +16,6 @@ class ForumReply(Base):
 
     # optional backref to allow eager access if needed
     post = relationship("ForumPost", backref="replies_list")
+
+    # thread pages walk (post_id, timestamp, id) in order
+    __table_args__ = (Index("ix_forum_replies_post_timestamp", "post_id", "timestamp", "id"),)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, JSON, DateTime, Index, func
+from app.db.database import Base
+
+
+class PdfExtractionCache(Base):
+    __tablename__ = "pdf_extraction_cache"
+
+    # sha256 of (model, prompt, text)
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # eviction drops the least recently used rows first
+    __table_args__ = (Index("ix_pdf_extraction_cache_last_used", "last_used_at"),)
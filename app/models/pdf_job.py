@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Float, Index, func
+from app.db.database import Base
+
+
+class PdfJob(Base):
+    __tablename__ = "pdf_jobs"
+
+    id = Column(String(32), primary_key=True)
+    status = Column(String, nullable=False, default="queued")  # queued|running|succeeded|failed
+    model = Column(String, nullable=False)
+    prompt = Column(Text, nullable=False)
+    text = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    # seconds until the next attempt while the model is loading
+    estimated_time = Column(Float, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # workers pick up unfinished jobs after a restart
+    __table_args__ = (Index("ix_pdf_jobs_status", "status"),)
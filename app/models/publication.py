@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, func, ForeignKey, Index, cast, literal_column
 from app.db.database import Base
 
 
@@ -21,3 +21,30 @@ class Publication(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+SEARCH_CONFIG = literal_column("'english'")
+
+
+def publication_search_vector():
+    # Weighted tsvector over the searchable fields. Queries must build the vector
+    # through this helper so Postgres can match it against ix_publications_search.
+    def part(column, weight):
+        return func.setweight(
+            func.to_tsvector(SEARCH_CONFIG, func.coalesce(column, literal_column("''"))),
+            literal_column(f"'{weight}'"),
+        )
+
+    return (
+        part(Publication.title, "A")
+        .op("||")(part(cast(Publication.tags, Text), "B"))
+        .op("||")(part(Publication.authors, "B"))
+        .op("||")(part(Publication.abstract, "C"))
+        .op("||")(part(Publication.fullAbstract, "D"))
+    )
+
+
+# GIN index only exists on Postgres; SQLite falls back to app.services.search
+Index(
+    "ix_publications_search",
+    publication_search_vector(),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
@@ -1,7 +1,13 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
+
+def normalize_tag(tag: str | None) -> str:
+    """Canonical form of a tag, shared by researcher_profile_tags and the recommendation index."""
+    return " ".join((tag or "").lower().split())
+
+
 class ResearcherProfile(Base):
     __tablename__ = "researcher_profiles"
 
@@ -9,6 +15,45 @@ class ResearcherProfile(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     condition = Column(String, nullable=False)
     location = Column(String, nullable=True)
-    tags = Column(String, nullable=True)
 
     user = relationship("User", back_populates="researcher_profile")
+    tag_links = relationship(
+        "ResearcherProfileTag",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="ResearcherProfileTag.position",
+    )
+
+    @property
+    def tags(self) -> list[str]:
+        return [link.tag for link in self.tag_links]
+
+    def set_tags(self, tags) -> None:
+        # existing links are reused so an unchanged tag is not deleted and re-inserted
+        # under the same primary key in one flush
+        existing = {link.normalized: link for link in self.tag_links}
+        links = []
+        for tag in tags or ():
+            tag = tag.strip()
+            normalized = normalize_tag(tag)
+            if not normalized or any(link.normalized == normalized for link in links):
+                continue
+            link = existing.get(normalized) or ResearcherProfileTag(normalized=normalized)
+            link.tag = tag
+            link.position = len(links)
+            links.append(link)
+        self.tag_links = links
+
+
+class ResearcherProfileTag(Base):
+    __tablename__ = "researcher_profile_tags"
+
+    profile_id = Column(Integer, ForeignKey("researcher_profiles.id", ondelete="CASCADE"), primary_key=True)
+    normalized = Column(String, primary_key=True)
+    tag = Column(String, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # "researchers tagged X" is an index range scan on (normalized, profile_id)
+        Index("ix_researcher_profile_tags_normalized", "normalized", "profile_id"),
+    )
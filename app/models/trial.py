@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, JSON, ForeignKey, Index
 from app.db.database import Base
 
 
@@ -18,3 +18,12 @@ class Trial(Base):
     enrollment = Column(String, nullable=True)
     status = Column(String, default="active")
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # (filter, id) composites so a filtered keyset page is a single index range scan
+    __table_args__ = (
+        Index("ix_trials_recruiting_id", "recruiting", "id"),
+        Index("ix_trials_phase_id", "phase", "id"),
+        Index("ix_trials_status_id", "status", "id"),
+        Index("ix_trials_location_id", "location", "id"),
+        Index("ix_trials_institution_id", "institution", "id"),
+    )
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class BulkRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class BulkImportResult(BaseModel):
+    total: int
+    inserted: int
+    ids: List[int]
+    errors: List[BulkRowError]
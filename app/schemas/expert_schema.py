@@ -28,6 +28,7 @@ class ExpertOut(BaseModel):
     education: Optional[List[str]] = []
     publications: int
     contact: Optional[Contact] = None
+    favourited: Optional[bool] = None
 
     class Config:
         from_attributes = True
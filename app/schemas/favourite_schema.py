@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal
+
+ContentType = Literal["trial", "expert", "publication"]
+
+
+class FavouriteRef(BaseModel):
+    content_type: ContentType
+    content_id: int
+
+
+class FavouriteStatusRequest(BaseModel):
+    items: List[FavouriteRef] = Field(..., max_length=500)
+
+
+class FavouriteStatusOut(FavouriteRef):
+    favourited: bool
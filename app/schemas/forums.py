@@ -2,6 +2,13 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 
+class ForumCategoryOut(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        from_attributes = True
+
 class ForumPostBase(BaseModel):
     title: str
     author: str
@@ -24,6 +31,7 @@ class ForumPostUpdate(BaseModel):
 class ForumPostOut(ForumPostBase):
     id: int
     timestamp: datetime
+    last_activity_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
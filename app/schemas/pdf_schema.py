@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+from datetime import datetime
 
 class PDFExtractRequest(BaseModel):
     model: str
@@ -10,4 +11,14 @@ class PDFExtractResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     estimated_time: Optional[float] = None
+    cached: Optional[bool] = None
 
+class PDFJobOut(BaseModel):
+    id: str
+    status: str
+    attempts: int
+    metadata: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    estimated_time: Optional[float] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
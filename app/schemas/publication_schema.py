@@ -29,8 +29,21 @@ class PublicationOut(BaseModel):
     methodology: Optional[str] = None
     results: Optional[str] = None
     conclusion: Optional[str] = None
+    favourited: Optional[bool] = None
 
     class Config:
         from_attributes = True
 
 
+class PublicationSearchHit(BaseModel):
+    publication: PublicationOut
+    score: float
+    snippet: Optional[str] = None
+
+
+class PublicationSearchResult(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: List[PublicationSearchHit]
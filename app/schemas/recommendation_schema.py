@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.expert_schema import ExpertOut
+from app.schemas.publication_schema import PublicationOut
+
+
+class ExpertRecommendation(BaseModel):
+    expert: ExpertOut
+    score: float
+    matched_tags: List[str] = []
+
+
+class PublicationRecommendation(BaseModel):
+    publication: PublicationOut
+    score: float
+    matched_tags: List[str] = []
+
+
+class RecommendationsOut(BaseModel):
+    experts: List[ExpertRecommendation]
+    publications: List[PublicationRecommendation]
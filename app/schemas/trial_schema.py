@@ -35,6 +35,13 @@ class TrialOut(BaseModel):
     institution: Optional[str] = None
     enrollment: Optional[str] = None
     status: str
+    favourited: Optional[bool] = None
 
     class Config:
         from_attributes = True
+
+
+class TrialMatch(BaseModel):
+    trial: TrialOut
+    score: float
+    matched_terms: List[str] = []
@@ -0,0 +1,136 @@
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+BATCH_SIZE = 1000
+
+
+def _csv_cell(value: str):
+    # list / object fields (eligibility, tags, contact) are written as JSON inside the cell
+    value = value.strip()
+    if value[:1] in ("[", "{"):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def iter_rows(request: Request) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield (row_number, raw_row, parse_error) from a JSON array, NDJSON or CSV body."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        row = 0
+        async for line in _iter_lines(request):
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                yield row, json.loads(line), None
+            except ValueError as e:
+                yield row, None, f"Invalid JSON: {e}"
+
+    elif content_type == "text/csv":
+        header = None
+        row = 0
+        pending = ""
+        async for line in _iter_lines(request):
+            # a quoted cell may span lines; wait until the quotes balance
+            pending = f"{pending}\n{line}" if pending else line
+            if pending.count('"') % 2:
+                continue
+            line, pending = pending, ""
+            if not line.strip():
+                continue
+            values = next(csv.reader(io.StringIO(line)))
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+            row += 1
+            if len(values) != len(header):
+                yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            yield row, {k: _csv_cell(v) for k, v in zip(header, values) if v.strip()}, None
+
+    else:
+        try:
+            data = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+        if not isinstance(data, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of rows")
+        for row, item in enumerate(data, start=1):
+            yield row, item, None
+
+
+async def bulk_insert(
+    request: Request,
+    db: AsyncSession,
+    model,
+    schema: type[BaseModel],
+    user_id: int,
+    all_or_nothing: bool = False,
+) -> dict:
+    """Validate every row with `schema` and insert the valid ones in batched INSERT ... RETURNING."""
+    rows: list[dict] = []
+    errors: list[dict] = []
+    total = 0
+
+    async for row, raw, parse_error in iter_rows(request):
+        total += 1
+        if total > settings.BULK_IMPORT_MAX_ROWS:
+            raise HTTPException(status_code=413, detail=f"At most {settings.BULK_IMPORT_MAX_ROWS} rows per import")
+        if parse_error:
+            errors.append({"row": row, "errors": [parse_error]})
+            continue
+        try:
+            # exclude_unset mirrors the single-row create handlers so DB defaults still apply
+            values = schema.model_validate(raw).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            errors.append({"row": row, "errors": [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]})
+            continue
+        values["user_id"] = user_id
+        rows.append(values)
+
+    if all_or_nothing and errors:
+        return {"total": total, "inserted": 0, "ids": [], "rows": [], "errors": errors}
+
+    ids: list[int] = []
+    inserted_rows: list[dict] = []
+    # executemany needs uniform keys, so rows are grouped by the set of fields they set
+    groups: dict[tuple, list[dict]] = {}
+    for values in rows:
+        groups.setdefault(tuple(sorted(values)), []).append(values)
+
+    for group in groups.values():
+        for start in range(0, len(group), BATCH_SIZE):
+            batch = group[start:start + BATCH_SIZE]
+            result = await db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), batch)
+            ids.extend(result.scalars().all())
+            inserted_rows.extend(batch)
+    await db.commit()
+
+    return {"total": total, "inserted": len(ids), "ids": ids, "rows": inserted_rows, "errors": errors}
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from app.db.database import AsyncSessionLocal
+
+EXPORT_BATCH_SIZE = 500
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _csv_line(values: list) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(values)
+    return buf.getvalue()
+
+
+async def _encoded_rows(model, schema: type[BaseModel], fmt: str) -> AsyncIterator[str]:
+    fields = [name for name in schema.model_fields if name != "favourited"]
+    if fmt == "csv":
+        yield _csv_line(fields)
+
+    # own session: the stream outlives the request handler; rows come off a server-side cursor
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            select(model).order_by(model.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for obj in result.scalars():
+            item = schema.model_validate(obj)
+            if fmt == "ndjson":
+                yield item.model_dump_json(include=set(fields)) + "\n"
+            else:
+                # list / object fields as JSON cells, the same form the bulk import reads
+                data = item.model_dump(mode="json", include=set(fields))
+                yield _csv_line([
+                    json.dumps(data[f]) if isinstance(data[f], (list, dict)) else data[f]
+                    for f in fields
+                ])
+
+
+def accepts_gzip(header: str | None) -> bool:
+    """Whether an Accept-Encoding header allows gzip; `gzip;q=0` explicitly refuses it."""
+    qualities = {}
+    for item in (header or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding.lower()] = q
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+async def _gzipped(lines: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    async for line in lines:
+        chunk = compressor.compress(line.encode())
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+async def _encoded(lines: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    async for line in lines:
+        yield line.encode()
+
+
+def export_response(request: Request, model, schema: type[BaseModel], name: str, fmt: str) -> StreamingResponse:
+    """Stream every row of `model` as NDJSON or CSV, gzip-compressed when the client accepts it."""
+    lines = _encoded_rows(model, schema, fmt)
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"', "Vary": "Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        body = _gzipped(lines)
+    else:
+        body = _encoded(lines)
+    return StreamingResponse(body, media_type=MEDIA_TYPES[fmt], headers=headers)
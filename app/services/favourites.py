@@ -0,0 +1,40 @@
+from sqlalchemy import and_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.favourite import Favourite
+
+
+def with_favourited(query, model, content_type: str, user_id: int):
+    """LEFT JOIN the user's favourites onto a list query, adding a `favourited` column."""
+    return query.add_columns(Favourite.id.isnot(None).label("favourited")).outerjoin(
+        Favourite,
+        and_(
+            Favourite.user_id == user_id,
+            Favourite.content_type == content_type,
+            Favourite.content_id == model.id,
+        ),
+    )
+
+
+def annotate_favourited(rows) -> list:
+    # rows come from with_favourited(); expose the flag as an attribute for the *Out schemas
+    items = []
+    for obj, favourited in rows:
+        obj.favourited = bool(favourited)
+        items.append(obj)
+    return items
+
+
+async def favourited_pairs(db: AsyncSession, user_id: int, pairs) -> set[tuple[str, int]]:
+    """Return which (content_type, content_id) pairs the user has favourited, in one query."""
+    pairs = list(pairs)
+    if not pairs:
+        return set()
+    # served by the (user_id, content_type, content_id) uix_user_content index
+    q = await db.execute(
+        select(Favourite.content_type, Favourite.content_id).where(
+            Favourite.user_id == user_id,
+            tuple_(Favourite.content_type, Favourite.content_id).in_(pairs),
+        )
+    )
+    return {(content_type, content_id) for content_type, content_id in q.all()}
@@ -0,0 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+
+from app.core.config import settings
+
+_client: httpx.AsyncClient | None = None
+_host_slots: dict[str, asyncio.Semaphore] = {}
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(http2=settings.HTTP_HTTP2, limits=limits, timeout=httpx.Timeout(80.0, connect=10.0))
+
+
+async def start_http_client() -> None:
+    global _client
+    if _client is None:
+        _client = _build_client()
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Application-wide client; created by the lifespan hook, or lazily outside of it."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+@asynccontextmanager
+async def host_slot(url: str):
+    # caps in-flight requests per upstream host so one slow host can't take the whole pool
+    host = httpx.URL(url).host
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = _host_slots[host] = asyncio.Semaphore(settings.HTTP_MAX_CONCURRENCY_PER_HOST)
+    async with slot:
+        yield
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+
+from sqlalchemy import delete, func, select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.pdf_extraction_cache import PdfExtractionCache
+from app.services.pdf_extraction import extract_metadata
+
+logger = logging.getLogger(__name__)
+
+EVICT_EVERY = 100
+
+
+class ExtractionCache:
+    """Two-tier (memory LRU, then database) cache of parsed extraction results."""
+
+    def __init__(self, memory_size: int, ttl: int, db_max_entries: int):
+        self.memory = TTLCache(maxsize=memory_size, ttl=ttl)
+        self.db_max_entries = db_max_entries
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    @staticmethod
+    def key(model: str, prompt: str, text: str) -> str:
+        return hashlib.sha256(json.dumps([model, prompt, text]).encode()).hexdigest()
+
+    async def get(self, key: str, count: bool = True) -> dict | None:
+        """Look up a result; pass count=False for lookups that must not skew the hit rate.
+
+        Each extraction should be counted once, by its top-level lookup: chunk lookups
+        and repeat lookups of the same job are not.
+        """
+        metadata = self.memory.get(key)
+        if metadata is not None:
+            if count:
+                self.memory_hits += 1
+            return metadata
+
+        try:
+            async with AsyncSessionLocal() as session:
+                row = await session.get(PdfExtractionCache, key)
+                if row is not None:
+                    row.last_used_at = func.now()
+                    await session.commit()
+                    metadata = row.result
+        except Exception:
+            logger.exception("PDF extraction cache lookup failed")
+
+        if metadata is None:
+            if count:
+                self.misses += 1
+            return None
+        if count:
+            self.db_hits += 1
+        self.memory.set(key, metadata)
+        return metadata
+
+    async def put(self, key: str, model: str, metadata: dict) -> None:
+        self.memory.set(key, metadata)
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.merge(PdfExtractionCache(key=key, model=model, result=metadata))
+                self._writes += 1
+                if self._writes % EVICT_EVERY == 0:
+                    await self._evict(session)
+                await session.commit()
+        except Exception:
+            logger.exception("PDF extraction cache write failed")
+
+    async def _evict(self, session) -> None:
+        stale = (
+            select(PdfExtractionCache.key)
+            .order_by(PdfExtractionCache.last_used_at.desc())
+            .offset(self.db_max_entries)
+        )
+        await session.execute(delete(PdfExtractionCache).where(PdfExtractionCache.key.in_(stale)))
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        hits = self.memory_hits + self.db_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+
+extraction_cache = ExtractionCache(
+    memory_size=settings.PDF_CACHE_MEMORY_ENTRIES,
+    ttl=settings.PDF_CACHE_TTL_SECONDS,
+    db_max_entries=settings.PDF_CACHE_DB_MAX_ENTRIES,
+)
+
+
+async def cached_extract_metadata(model: str, prompt: str, text: str, count: bool = True) -> tuple[dict, bool]:
+    """Return (metadata, cached); identical (model, prompt, text) never reaches the model twice."""
+    key = extraction_cache.key(model, prompt, text)
+    metadata = await extraction_cache.get(key, count=count)
+    if metadata is not None:
+        return metadata, True
+
+    metadata = await extract_metadata(model, prompt, text)
+    await extraction_cache.put(key, model, metadata)
+    return metadata, False
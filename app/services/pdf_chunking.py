@@ -0,0 +1,178 @@
+import asyncio
+import json
+import re
+
+from app.core.config import settings
+from app.services.pdf_cache import extraction_cache, cached_extract_metadata
+from app.services.pdf_extraction import ExtractionError, ModelLoadingError
+
+# rough budget conversion; HF text models average ~4 characters per token on English prose
+CHARS_PER_TOKEN = 4
+
+_HEADING_RE = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*\.?\s+)?"
+    r"(?:abstract|introduction|background|methods?|methodology|materials and methods|"
+    r"results|discussion|conclusions?|references|acknowledg(?:e)?ments)\b.*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def _sections(text: str) -> list[str]:
+    starts = sorted({0, *(m.start() for m in _HEADING_RE.finditer(text))})
+    bounds = zip(starts, [*starts[1:], len(text)])
+    return [text[a:b] for a, b in bounds if text[a:b].strip()]
+
+
+def _split_oversized(section: str, max_chars: int) -> list[str]:
+    # paragraphs first, then hard cuts for paragraphs that are still too long
+    pieces = []
+    for para in re.split(r"\n\s*\n", section):
+        while len(para) > max_chars:
+            cut = para.rfind(" ", 0, max_chars)
+            cut = cut if cut > max_chars // 2 else max_chars
+            pieces.append(para[:cut])
+            para = para[cut:]
+        if para.strip():
+            pieces.append(para)
+    return pieces
+
+
+def split_text(text: str, max_tokens: int | None = None) -> list[str]:
+    """Split text on section headings, packing sections into chunks within the token budget."""
+    max_chars = (max_tokens or settings.PDF_CHUNK_TOKENS) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks, current = [], ""
+    for section in _sections(text):
+        for piece in (_split_oversized(section, max_chars) if len(section) > max_chars else [section]):
+            if current and len(current) + len(piece) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _merge_value(existing, new):
+    if existing in (None, "", [], {}):
+        return new
+    if isinstance(existing, list) and isinstance(new, list):
+        seen = {json.dumps(v, sort_keys=True) for v in existing}
+        merged = list(existing)
+        for v in new:
+            marker = json.dumps(v, sort_keys=True)
+            if marker not in seen:
+                seen.add(marker)
+                merged.append(v)
+        return merged
+    if isinstance(existing, dict) and isinstance(new, dict):
+        return merge_metadata([existing, new])
+    # scalars: the earliest chunk wins (title, journal and year sit at the front of a paper)
+    return existing
+
+
+def merge_metadata(partials: list[dict]) -> dict:
+    """Merge per-chunk metadata in chunk order; the result depends only on the inputs' order."""
+    merged: dict = {}
+    for partial in partials:
+        for key, value in (partial or {}).items():
+            merged[key] = _merge_value(merged.get(key), value)
+    return merged
+
+
+def _start_chunks(model: str, prompt: str, chunks: list[str]) -> list[asyncio.Task]:
+    semaphore = asyncio.Semaphore(settings.PDF_CHUNK_CONCURRENCY)
+
+    async def run(index: int, chunk: str):
+        async with semaphore:
+            try:
+                # only the document-level lookup counts towards the cache hit rate
+                metadata, _ = await cached_extract_metadata(model, prompt, chunk, count=False)
+                return index, metadata, None
+            except ModelLoadingError:
+                raise
+            except ExtractionError as e:
+                return index, None, e
+
+    return [asyncio.create_task(run(i, chunk)) for i, chunk in enumerate(chunks)]
+
+
+async def _cancel(tasks: list[asyncio.Task]) -> None:
+    # once the document has failed (e.g. cold model) or the caller has gone, stop the other chunks
+    pending = [task for task in tasks if not task.done()]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _reduce(results: list) -> dict:
+    ordered = sorted(results, key=lambda r: r[0])
+    partials = [metadata for _, metadata, _ in ordered if metadata is not None]
+    if not partials:
+        # every chunk failed; surface the first chunk's error
+        raise ordered[0][2]
+    return merge_metadata(partials)
+
+
+async def extract_document(model: str, prompt: str, text: str, count: bool = True) -> tuple[dict, bool]:
+    """Map the prompt over the text's chunks concurrently and reduce to one metadata dict.
+
+    `count=False` when the caller has already counted this extraction's cache lookup.
+    """
+    chunks = split_text(text)
+    if len(chunks) == 1:
+        return await cached_extract_metadata(model, prompt, text, count=count)
+
+    key = extraction_cache.key(model, prompt, text)
+    cached = await extraction_cache.get(key, count=count)
+    if cached is not None:
+        return cached, True
+
+    tasks = _start_chunks(model, prompt, chunks)
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        await _cancel(tasks)
+    metadata = _reduce(results)
+    await extraction_cache.put(key, model, metadata)
+    return metadata, False
+
+
+async def stream_document(model: str, prompt: str, text: str):
+    """Yield NDJSON events: one per finished chunk, then the merged result."""
+    chunks = split_text(text)
+    key = extraction_cache.key(model, prompt, text)
+    cached = await extraction_cache.get(key)
+    if cached is not None:
+        yield json.dumps({"done": True, "cached": True, "metadata": cached}) + "\n"
+        return
+
+    results = []
+    tasks = _start_chunks(model, prompt, chunks)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, metadata, error = await next_done
+            results.append((index, metadata, error))
+            event = {"chunk": index, "total": len(chunks), "metadata": metadata}
+            if error is not None:
+                event["error"] = error.detail
+            yield json.dumps(event) + "\n"
+
+        metadata = _reduce(results)
+    except ModelLoadingError as e:
+        yield json.dumps({"done": True, "error": e.detail, "estimated_time": e.estimated_time}) + "\n"
+        return
+    except ExtractionError as e:
+        yield json.dumps({"done": True, "error": e.detail}) + "\n"
+        return
+    except Exception as e:
+        yield json.dumps({"done": True, "error": f"Unexpected error: {e}"}) + "\n"
+        return
+    finally:
+        # also reached when the client disconnects and the generator is closed
+        await _cancel(tasks)
+
+    await extraction_cache.put(key, model, metadata)
+    yield json.dumps({"done": True, "cached": False, "metadata": metadata}) + "\n"
@@ -0,0 +1,85 @@
+import json
+import re
+
+from app.core.config import settings
+from app.services.http_client import get_http_client, host_slot
+
+HF_ROUTER_URL = "https://router.huggingface.co/hf-inference/models/{model}"
+
+
+class ExtractionError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ModelLoadingError(ExtractionError):
+    # HF router returns 503 while the model is cold; estimated_time is in seconds
+    def __init__(self, detail: str, estimated_time: float | None):
+        super().__init__(503, detail)
+        self.estimated_time = estimated_time
+
+
+def parse_generated_metadata(data) -> dict:
+    # --- Parse output ---
+    generated = ""
+    if isinstance(data, list) and len(data) > 0:
+        generated = data[0].get("generated_text", "") or data[0].get("text", "")
+    elif isinstance(data, dict):
+        generated = data.get("generated_text", "") or data.get("text", "")
+
+    if not generated:
+        raise ExtractionError(500, f"No generated_text in HF response: {data}")
+
+    # --- Clean markdown & extract JSON ---
+    cleaned = (
+        generated.replace("```json", "")
+                 .replace("```", "")
+                 .strip()
+    )
+
+    match = re.search(r"\{[\s\S]*\}", cleaned)
+
+    if not match:
+        raise ExtractionError(500, f"No JSON found in model output. Raw: {cleaned[:400]}")
+
+    try:
+        return json.loads(match.group(0))
+    except ValueError as e:
+        raise ExtractionError(500, f"Model output is not valid JSON ({e}). Raw: {cleaned[:400]}")
+
+
+async def extract_metadata(model: str, prompt: str, text: str) -> dict:
+    """Run one HF inference call and return the parsed metadata dict."""
+    api_key = settings.HUGGINGFACE_API_KEY
+    if not api_key:
+        raise ExtractionError(500, "Hugging Face API key not configured.")
+
+    payload = {
+        "inputs": prompt + "\n\nPDF TEXT:\n" + text,
+        "parameters": {
+            "max_new_tokens": 1500,
+            "temperature": 0.1,
+            "return_full_text": False,
+            "top_p": 0.95,
+        }
+    }
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+    url = HF_ROUTER_URL.format(model=model)
+    async with host_slot(url):
+        response = await get_http_client().post(url, headers=headers, json=payload)
+
+    if response.status_code == 503:
+        err = response.json()
+        raise ModelLoadingError(err.get("error", "Model is loading"), err.get("estimated_time"))
+
+    if not response.is_success:
+        raise ExtractionError(response.status_code, f"Hugging Face API error: {response.text}")
+
+    return parse_generated_metadata(response.json())
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.pdf_job import PdfJob
+from app.services.pdf_extraction import ExtractionError, ModelLoadingError
+from app.services.pdf_cache import extraction_cache
+from app.services.pdf_chunking import extract_document
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_DELAY = 20.0
+MAX_RETRY_DELAY = 300.0
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class PdfJobQueue:
+    """Bounded in-process worker pool for PDF metadata jobs; job state lives in `pdf_jobs`."""
+
+    def __init__(self, workers: int, maxsize: int, max_attempts: int, lease_seconds: int):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._delayed: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        try:
+            await self._recover()
+        except Exception:
+            logger.exception("Could not recover unfinished PDF jobs")
+
+    async def stop(self) -> None:
+        for task in [*self._tasks, *self._delayed]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._delayed, return_exceptions=True)
+        self._tasks = []
+        self._delayed.clear()
+
+    async def _recover(self) -> None:
+        # other worker processes may recover the same rows; _claim lets only one of them run each
+        async with AsyncSessionLocal() as session:
+            # a "running" job whose lease expired was orphaned by a process that died mid-flight
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+            await session.execute(
+                update(PdfJob)
+                .where(PdfJob.status == "running", PdfJob.updated_at < cutoff)
+                .values(status="queued")
+            )
+            await session.commit()
+            # extra ones wait for the next restart
+            result = await session.scalars(
+                select(PdfJob.id)
+                .where(PdfJob.status == "queued")
+                .order_by(PdfJob.created_at)
+                .limit(self.maxsize)
+            )
+            for job_id in result.all():
+                self._queue.put_nowait(job_id)
+
+    async def submit(self, model: str, prompt: str, text: str) -> PdfJob:
+        await self.start()
+
+        # a cached result completes the job immediately without taking a queue slot
+        cached = await extraction_cache.get(extraction_cache.key(model, prompt, text))
+        if cached is None and self._queue.full():
+            raise QueueFullError()
+
+        job = PdfJob(id=uuid.uuid4().hex, status="queued", model=model, prompt=prompt, text=text, attempts=0)
+        if cached is not None:
+            job.status = "succeeded"
+            job.result = cached
+        async with AsyncSessionLocal() as session:
+            session.add(job)
+            await session.commit()
+            await session.refresh(job)
+            if cached is None:
+                try:
+                    self._queue.put_nowait(job.id)
+                except asyncio.QueueFull:
+                    # other submits filled the queue while this one was committing; drop the
+                    # row rather than leave a queued job that no worker will pick up
+                    await session.execute(delete(PdfJob).where(PdfJob.id == job.id))
+                    await session.commit()
+                    raise QueueFullError()
+        return job
+
+    def _retry_later(self, job_id: str, delay: float) -> None:
+        async def requeue():
+            await asyncio.sleep(delay)
+            await self._queue.put(job_id)
+
+        task = asyncio.create_task(requeue())
+        self._delayed.add(task)
+        task.add_done_callback(self._delayed.discard)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("PDF job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    async def _claim(session, job_id: str) -> bool:
+        """Move a queued job to running; False if it is gone, finished, or another worker has it."""
+        result = await session.execute(
+            update(PdfJob)
+            .where(PdfJob.id == job_id, PdfJob.status == "queued")
+            .values(status="running", attempts=PdfJob.attempts + 1, estimated_time=None)
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+    async def _run(self, job_id: str) -> None:
+        async with AsyncSessionLocal() as session:
+            if not await self._claim(session, job_id):
+                return
+            job = await session.get(PdfJob, job_id)
+
+            retry_delay = None
+            try:
+                # submit() already counted this job's cache lookup
+                job.result, _ = await extract_document(job.model, job.prompt, job.text, count=False)
+                job.status = "succeeded"
+                job.error = None
+            except ModelLoadingError as e:
+                job.error = e.detail
+                if job.attempts >= self.max_attempts:
+                    job.status = "failed"
+                else:
+                    # honour the router's estimate for when the model will be warm
+                    retry_delay = min(float(e.estimated_time or DEFAULT_RETRY_DELAY), MAX_RETRY_DELAY)
+                    job.status = "queued"
+                    job.estimated_time = retry_delay
+            except ExtractionError as e:
+                job.status = "failed"
+                job.error = e.detail
+            except Exception as e:
+                job.status = "failed"
+                job.error = f"Unexpected error: {e}"
+
+            await session.commit()
+
+        if retry_delay is not None:
+            self._retry_later(job_id, retry_delay)
+
+
+pdf_job_queue = PdfJobQueue(
+    workers=settings.PDF_JOB_WORKERS,
+    maxsize=settings.PDF_JOB_QUEUE_SIZE,
+    max_attempts=settings.PDF_JOB_MAX_ATTEMPTS,
+    lease_seconds=settings.PDF_JOB_LEASE_SECONDS,
+)
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import math
+import time
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.expert import Expert
+from app.models.publication import Publication
+from app.models.researcher_profile import normalize_tag
+from app.services.search import tokenize
+
+logger = logging.getLogger(__name__)
+
+# a whole-tag hit ("breast cancer") outweighs sharing one of its words ("cancer")
+TAG_WEIGHT = 1.0
+TERM_WEIGHT = 0.4
+CONDITION_BOOST = 1.5
+
+
+def tag_features(tags) -> set[str]:
+    """Whole normalized tags plus their individual terms, prefixed so the two never collide."""
+    features = set()
+    for tag in tags or ():
+        normalized = normalize_tag(tag)
+        if not normalized:
+            continue
+        features.add(f"tag:{normalized}")
+        features.update(f"term:{term}" for term in tokenize(normalized))
+    return features
+
+
+def query_vector(condition: str | None, tags) -> dict[str, float]:
+    vector: dict[str, float] = defaultdict(float)
+    for source, boost in ((tags or [], 1.0), ([condition] if condition else [], CONDITION_BOOST)):
+        for feature in tag_features(source):
+            weight = TAG_WEIGHT if feature.startswith("tag:") else TERM_WEIGHT
+            vector[feature] = max(vector[feature], weight * boost)
+    return vector
+
+
+def _expert_tags(expert) -> list[str]:
+    return [*(expert.expertise or []), *([expert.specialty] if expert.specialty else [])]
+
+
+def _publication_tags(pub) -> list[str]:
+    return list(pub.tags or [])
+
+
+class TagIndex:
+    """Normalized tag -> {ids} index; scoring only visits ids that share a tag with the query."""
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._postings: dict[str, set[int]] = defaultdict(set)
+        self._doc_features: dict[int, set[str]] = {}
+        self._built_at: float | None = None
+        # writes made while a rebuild loads its documents, replayed onto the rebuilt index
+        self._pending: list[tuple[str, tuple]] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._built_at is not None
+
+    @property
+    def rebuilding(self) -> bool:
+        return self._pending is not None
+
+    def __len__(self):
+        return len(self._doc_features)
+
+    def upsert(self, doc_id: int, tags) -> None:
+        if self._pending is not None:
+            self._pending.append(("upsert", (doc_id, tags)))
+        self._drop(doc_id)
+        features = tag_features(tags)
+        if not features:
+            return
+        for feature in features:
+            self._postings[feature].add(doc_id)
+        self._doc_features[doc_id] = features
+
+    def remove(self, doc_id: int) -> None:
+        if self._pending is not None:
+            self._pending.append(("remove", (doc_id,)))
+        self._drop(doc_id)
+
+    def _drop(self, doc_id: int) -> None:
+        for feature in self._doc_features.pop(doc_id, ()):
+            postings = self._postings.get(feature)
+            if postings is None:
+                continue
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[feature]
+
+    async def rebuild(self, load) -> None:
+        """Build an index from `await load()` aside and swap it in; the old one serves meanwhile."""
+        fresh = TagIndex(self.refresh_seconds)
+        self._pending = []
+        try:
+            for doc_id, tags in await load():
+                fresh.upsert(doc_id, tags)
+            for op, args in self._pending:
+                getattr(fresh, op)(*args)
+        finally:
+            self._pending = None
+        self._postings, self._doc_features = fresh._postings, fresh._doc_features
+        self._built_at = time.monotonic()
+
+    def stale(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at >= self.refresh_seconds
+
+    def score(self, query: dict[str, float], limit: int) -> list[tuple[int, float, list[str]]]:
+        """Cosine-style similarity between the query and each candidate's idf-weighted tag vector."""
+        n_docs = len(self._doc_features) or 1
+        weighted = {}
+        for feature, weight in query.items():
+            postings = self._postings.get(feature)
+            if postings:
+                weighted[feature] = (weight * math.log(1 + n_docs / len(postings)), postings)
+        if not weighted:
+            return []
+
+        scores: dict[int, float] = defaultdict(float)
+        matched: dict[int, list[str]] = defaultdict(list)
+        for feature, (weight, postings) in weighted.items():
+            for doc_id in postings:
+                scores[doc_id] += weight
+                if feature.startswith("tag:"):
+                    matched[doc_id].append(feature[4:])
+
+        query_norm = math.sqrt(sum(w * w for w, _ in weighted.values()))
+        ranked = [
+            # documents with many tags are damped so one shared tag among fifty ranks lower
+            (doc_id, score / (query_norm * math.sqrt(len(self._doc_features[doc_id]))), sorted(matched[doc_id]))
+            for doc_id, score in scores.items()
+        ]
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+expert_tag_index = TagIndex(refresh_seconds=settings.RECOMMENDATION_REFRESH_SECONDS)
+publication_tag_index = TagIndex(refresh_seconds=settings.RECOMMENDATION_REFRESH_SECONDS)
+
+_refresh: asyncio.Task | None = None
+
+
+async def _load_experts():
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Expert.id, Expert.expertise, Expert.specialty))
+        return [(row.id, _expert_tags(row)) for row in result]
+
+
+async def _load_publications():
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Publication.id, Publication.tags))
+        return [(row.id, _publication_tags(row)) for row in result]
+
+
+async def _rebuild_stale() -> None:
+    if expert_tag_index.stale():
+        await expert_tag_index.rebuild(_load_experts)
+    if publication_tag_index.stale():
+        await publication_tag_index.rebuild(_load_publications)
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Recommendation index rebuild failed", exc_info=task.exception())
+
+
+async def ensure_fresh() -> None:
+    """Start a background rebuild of stale indexes; only the very first build is waited for."""
+    global _refresh
+    # incremental upserts keep this process current; the periodic rebuild picks up
+    # writes made by other workers
+    if not expert_tag_index.stale() and not publication_tag_index.stale():
+        return
+    if _refresh is None or _refresh.done():
+        _refresh = asyncio.create_task(_rebuild_stale())
+        _refresh.add_done_callback(_log_failure)
+    if not expert_tag_index.loaded or not publication_tag_index.loaded:
+        # shielded so one cancelled request does not abort the build the others wait on
+        await asyncio.shield(_refresh)
+
+
+def index_expert(expert) -> None:
+    # before the first recommendation request the indexes are built from the tables; a
+    # write racing a build is recorded and replayed onto it
+    if expert_tag_index.loaded or expert_tag_index.rebuilding:
+        expert_tag_index.upsert(expert.id, _expert_tags(expert))
+
+
+def index_publication_tags(pub) -> None:
+    if publication_tag_index.loaded or publication_tag_index.rebuilding:
+        publication_tag_index.upsert(pub.id, _publication_tags(pub))
+
+
+def unindex_publication_tags(pub_id: int) -> None:
+    publication_tag_index.remove(pub_id)
+
+
+async def recommend(db: AsyncSession, condition: str | None, tags, limit: int):
+    """Return ([(expert, score, matched_tags)], [(publication, score, matched_tags)])."""
+    await ensure_fresh()
+    query = query_vector(condition, tags)
+
+    async def load(model, ranked):
+        if not ranked:
+            return []
+        result = await db.execute(select(model).where(model.id.in_([doc_id for doc_id, _, _ in ranked])))
+        rows = {row.id: row for row in result.scalars()}
+        return [(rows[doc_id], score, matched) for doc_id, score, matched in ranked if doc_id in rows]
+
+    experts = await load(Expert, expert_tag_index.score(query, limit))
+    publications = await load(Publication, publication_tag_index.score(query, limit))
+    return experts, publications
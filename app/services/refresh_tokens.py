@@ -0,0 +1,134 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import generate_refresh_token, hash_refresh_token
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _invalid() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+
+def _add_token(db: AsyncSession, user_id: int, family_id: str | None) -> tuple[str, RefreshToken]:
+    token = generate_refresh_token()
+    row = RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        expires_at=_now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(row)
+    return token, row
+
+
+def issue_refresh_token(db: AsyncSession, user_id: int, family_id: str | None = None) -> str:
+    """Add a new refresh token row to the session and return the raw token; the caller commits."""
+    return _add_token(db, user_id, family_id)[0]
+
+
+async def _rotated_concurrently(db: AsyncSession, token_hash: str, now: datetime):
+    """The spent token's (user_id, family_id) if it was rotated moments ago, else None.
+
+    Outside the grace window a spent token being presented again means it leaked,
+    so the whole family is revoked and that login has to start over.
+    """
+    cutoff = now - timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+    result = await db.execute(
+        select(
+            RefreshToken.user_id,
+            RefreshToken.family_id,
+            RefreshToken.rotated_at.is_not(None).label("rotated"),
+            (RefreshToken.rotated_at > cutoff).label("in_grace"),
+        ).where(RefreshToken.token_hash == token_hash)
+    )
+    row = result.one_or_none()
+    # unknown, expired unused, or revoked by a logout
+    if row is None or not row.rotated:
+        return None
+
+    family_active = await db.scalar(
+        select(exists().where(RefreshToken.family_id == row.family_id, RefreshToken.revoked_at.is_(None)))
+    )
+    if row.in_grace and family_active:
+        return row
+    if family_active:
+        await revoke_family(db, row.family_id)
+        await db.commit()
+    return None
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple[User, str]:
+    """Spend a refresh token and return (user, replacement token).
+
+    Each token is spent once: the conditional UPDATE lets one of several concurrent
+    refreshes win. A loser arriving within REFRESH_TOKEN_REUSE_GRACE_SECONDS gets its
+    own replacement in the same family, so the winner's new token stays valid.
+    """
+    token_hash = hash_refresh_token(token)
+    now = _now()
+    result = await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked_at=now, rotated_at=now)
+        .returning(RefreshToken.id, RefreshToken.user_id, RefreshToken.family_id)
+    )
+    spent = result.one_or_none()
+    if spent is None:
+        spent = await _rotated_concurrently(db, token_hash, now)
+        if spent is None:
+            raise _invalid()
+        spent_id = None
+    else:
+        spent_id = spent.id
+
+    user = await db.get(User, spent.user_id)
+    if user is None:
+        raise _invalid()
+    new_token, row = _add_token(db, user.id, spent.family_id)
+    if spent_id is not None:
+        await db.flush()
+        await db.execute(update(RefreshToken).where(RefreshToken.id == spent_id).values(replaced_by_id=row.id))
+    await db.commit()
+    return user, new_token
+
+
+async def revoke_family(db: AsyncSession, family_id: str) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_now())
+    )
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
+    """Revoke the login a refresh token belongs to; returns False for unknown tokens."""
+    family_id = await db.scalar(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(token))
+    )
+    if family_id is None:
+        return False
+    await revoke_family(db, family_id)
+    await db.commit()
+    return True
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_now())
+    )
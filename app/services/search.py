@@ -0,0 +1,183 @@
+import math
+import re
+from collections import defaultdict
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.publication import Publication, SEARCH_CONFIG, publication_search_vector
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "to", "was", "were", "with",
+}
+
+# mirrors the A/B/B/C/D weights of publication_search_vector()
+FIELD_WEIGHTS = {"title": 1.0, "tags": 0.4, "authors": 0.4, "abstract": 0.2, "fullAbstract": 0.1}
+
+SNIPPET_WORDS = 30
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15"
+
+
+def _normalize(token: str) -> str:
+    # crude plural folding so "trials" finds "trial", like the english stemmer would
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return [_normalize(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _field_text(pub, field: str) -> str:
+    value = getattr(pub, field, None)
+    if field == "tags":
+        return " ".join(value or [])
+    return value or ""
+
+
+def highlight(text: str, terms: set[str], max_words: int = SNIPPET_WORDS) -> str | None:
+    words = text.split()
+    if not words:
+        return None
+
+    def is_hit(word):
+        return any(_normalize(t) in terms for t in _TOKEN_RE.findall(word.lower()))
+
+    first = next((i for i, w in enumerate(words) if is_hit(w)), 0)
+    start = max(first - max_words // 3, 0)
+    window = words[start:start + max_words]
+    marked = [f"<mark>{w}</mark>" if is_hit(w) else w for w in window]
+    prefix = "... " if start > 0 else ""
+    suffix = " ..." if start + max_words < len(words) else ""
+    return prefix + " ".join(marked) + suffix
+
+
+class InvertedIndex:
+    """In-process publication index used when the database has no full-text search."""
+
+    def __init__(self):
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._doc_terms: dict[int, set[str]] = {}
+        self._snippet_source: dict[int, str] = {}
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def add(self, pub) -> None:
+        self.remove(pub.id)
+        weights: dict[str, float] = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(_field_text(pub, field)):
+                weights[term] += weight
+        for term, weight in weights.items():
+            self._postings[term][pub.id] = weight
+        self._doc_terms[pub.id] = set(weights)
+        self._snippet_source[pub.id] = pub.abstract or pub.fullAbstract or pub.title or ""
+
+    def remove(self, pub_id: int) -> None:
+        for term in self._doc_terms.pop(pub_id, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(pub_id, None)
+            if not postings:
+                del self._postings[term]
+        self._snippet_source.pop(pub_id, None)
+
+    def search(self, query: str, limit: int, offset: int):
+        terms = set(tokenize(query))
+        if not terms:
+            return 0, []
+
+        # AND semantics, like websearch_to_tsquery: start from the rarest term
+        postings = sorted((self._postings.get(t, {}) for t in terms), key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates &= p.keys()
+            if not candidates:
+                return 0, []
+
+        n_docs = len(self._doc_terms)
+        scores = {}
+        for doc_id in candidates:
+            score = 0.0
+            for p in postings:
+                tf = p[doc_id]
+                score += (tf / (tf + 1.2)) * math.log(1 + n_docs / len(p))
+            scores[doc_id] = score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        page = ranked[offset:offset + limit]
+        return len(ranked), [
+            (doc_id, score, highlight(self._snippet_source.get(doc_id, ""), terms))
+            for doc_id, score in page
+        ]
+
+
+publication_index = InvertedIndex()
+
+
+async def _ensure_loaded(db: AsyncSession) -> None:
+    if publication_index.loaded:
+        return
+    result = await db.execute(select(Publication))
+    for pub in result.scalars():
+        publication_index.add(pub)
+    publication_index.loaded = True
+
+
+def index_publication(pub) -> None:
+    # before the first search the index is built from the table, so nothing to do yet
+    if publication_index.loaded:
+        publication_index.add(pub)
+
+
+def unindex_publication(pub_id: int) -> None:
+    publication_index.remove(pub_id)
+
+
+async def _search_postgres(db: AsyncSession, query: str, limit: int, offset: int):
+    vector = publication_search_vector()
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    matches = vector.op("@@")(ts_query)
+    rank = func.ts_rank_cd(vector, ts_query)
+    snippet = func.ts_headline(
+        SEARCH_CONFIG,
+        func.coalesce(Publication.abstract, Publication.fullAbstract, Publication.title),
+        ts_query,
+        HEADLINE_OPTIONS,
+    )
+
+    total = await db.scalar(select(func.count()).select_from(Publication).where(matches))
+    result = await db.execute(
+        select(Publication, rank.label("score"), snippet.label("snippet"))
+        .where(matches)
+        .order_by(rank.desc(), Publication.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    return total or 0, [(row.Publication, float(row.score), row.snippet) for row in result]
+
+
+async def _search_in_process(db: AsyncSession, query: str, limit: int, offset: int):
+    await _ensure_loaded(db)
+    total, hits = publication_index.search(query, limit, offset)
+    if not hits:
+        return total, []
+
+    result = await db.execute(select(Publication).where(Publication.id.in_([h[0] for h in hits])))
+    pubs = {p.id: p for p in result.scalars()}
+    return total, [(pubs[doc_id], score, snippet) for doc_id, score, snippet in hits if doc_id in pubs]
+
+
+async def search_publications(db: AsyncSession, query: str, limit: int = 20, offset: int = 0):
+    """Return (total, [(publication, score, snippet), ...]) ranked by relevance."""
+    if db.bind.dialect.name == "postgresql":
+        return await _search_postgres(db, query, limit, offset)
+    return await _search_in_process(db, query, limit, offset)
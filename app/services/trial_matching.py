@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import math
+import time
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.trial import Trial
+from app.services.search import tokenize
+
+logger = logging.getLogger(__name__)
+
+# eligibility criteria and the title carry the condition a trial is recruiting for
+FIELD_WEIGHTS = {"title": 3.0, "eligibility": 2.0, "summary": 1.0, "description": 0.5}
+LOCATION_WEIGHT = 0.5
+
+
+def _field_text(trial, field: str) -> str:
+    value = getattr(trial, field, None)
+    if field == "eligibility":
+        return " ".join(value or [])
+    return value or ""
+
+
+def _location_terms(location: str | None) -> set[str]:
+    return set(tokenize(location))
+
+
+def location_similarity(patient: set[str], trial: set[str]) -> float:
+    # no geocoding data; shared city/state/country tokens stand in for proximity
+    if not patient or not trial:
+        return 0.0
+    return len(patient & trial) / len(patient | trial)
+
+
+class TrialMatchIndex:
+    """Normalized term -> {trial_id: weight} index over recruiting trials' condition text."""
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._doc_terms: dict[int, set[str]] = {}
+        self._locations: dict[int, set[str]] = {}
+        self._built_at: float | None = None
+        # writes made while a rebuild reads the table, replayed onto the rebuilt index
+        self._pending: list[tuple[str, object]] | None = None
+        self._refresh: asyncio.Task | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._built_at is not None
+
+    @property
+    def rebuilding(self) -> bool:
+        return self._pending is not None
+
+    def upsert(self, trial) -> None:
+        if self._pending is not None:
+            self._pending.append(("upsert", trial))
+        self._drop(trial.id)
+        if not trial.recruiting:
+            return
+        weights: dict[str, float] = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(_field_text(trial, field)):
+                weights[term] += weight
+        for term, weight in weights.items():
+            self._postings[term][trial.id] = weight
+        self._doc_terms[trial.id] = set(weights)
+        self._locations[trial.id] = _location_terms(trial.location)
+
+    def remove(self, trial_id: int) -> None:
+        if self._pending is not None:
+            self._pending.append(("remove", trial_id))
+        self._drop(trial_id)
+
+    def _drop(self, trial_id: int) -> None:
+        for term in self._doc_terms.pop(trial_id, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(trial_id, None)
+            if not postings:
+                del self._postings[term]
+        self._locations.pop(trial_id, None)
+
+    async def ensure_fresh(self) -> None:
+        """Start a rebuild when stale; only the very first one is waited for."""
+        # incremental upserts keep this process current; the periodic rebuild picks up
+        # writes made by other workers
+        if self._built_at is not None and time.monotonic() - self._built_at < self.refresh_seconds:
+            return
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._rebuild())
+            self._refresh.add_done_callback(_log_failure)
+        if self._built_at is None:
+            # nothing to match against yet; shielded so one cancelled request does not
+            # abort the build the others are waiting on
+            await asyncio.shield(self._refresh)
+
+    async def _rebuild(self) -> None:
+        # built aside in its own session and swapped in, so requests keep matching
+        # against the previous index meanwhile
+        fresh = TrialMatchIndex(self.refresh_seconds)
+        self._pending = []
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(select(Trial).where(Trial.recruiting.is_(True)))
+                for trial in result.scalars():
+                    fresh.upsert(trial)
+            for op, arg in self._pending:
+                getattr(fresh, op)(arg)
+        finally:
+            self._pending = None
+        self._postings, self._doc_terms, self._locations = fresh._postings, fresh._doc_terms, fresh._locations
+        self._built_at = time.monotonic()
+
+    def match(self, condition: str, location: str | None, limit: int) -> list[tuple[int, float, list[str]]]:
+        terms = set(tokenize(condition))
+        if not terms:
+            return []
+
+        n_docs = len(self._doc_terms) or 1
+        scores: dict[int, float] = defaultdict(float)
+        matched: dict[int, list[str]] = defaultdict(list)
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + n_docs / len(postings))
+            for trial_id, weight in postings.items():
+                scores[trial_id] += idf * weight / (weight + 1.0)
+                matched[trial_id].append(term)
+
+        patient_location = _location_terms(location)
+        ranked = []
+        for trial_id, text_score in scores.items():
+            coverage = len(matched[trial_id]) / len(terms)
+            score = text_score * coverage
+            score += LOCATION_WEIGHT * location_similarity(patient_location, self._locations.get(trial_id, set()))
+            ranked.append((trial_id, score, sorted(matched[trial_id])))
+
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Trial match index rebuild failed", exc_info=task.exception())
+
+
+trial_match_index = TrialMatchIndex(refresh_seconds=settings.TRIAL_MATCH_REFRESH_SECONDS)
+
+
+def index_trial(trial) -> None:
+    # before the first match request the index is built from the table, so nothing to do
+    # yet; a write racing that first build is recorded and replayed onto it
+    if trial_match_index.loaded or trial_match_index.rebuilding:
+        trial_match_index.upsert(trial)
+
+
+def unindex_trial(trial_id: int) -> None:
+    trial_match_index.remove(trial_id)
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import init_db as init_db_module
+
+
+def test_init_db_on_fresh_sqlite_is_idempotent(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'init.db'}")
+    monkeypatch.setattr(init_db_module, "engine", engine)
+
+    async def main():
+        try:
+            await init_db_module.init_db()
+            # a second start runs every migration and index creation again
+            await init_db_module.init_db()
+            async with engine.connect() as conn:
+                return await conn.run_sync(
+                    lambda sync_conn: {i["name"] for i in inspect(sync_conn).get_indexes("forum_posts")}
+                )
+        finally:
+            await engine.dispose()
+
+    indexes = asyncio.run(main())
+    assert "ix_forum_posts_timestamp" in indexes
+    assert "ix_forum_posts_replies" not in indexes
@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services import pdf_chunking
+from app.services.pdf_extraction import ExtractionError, parse_generated_metadata
+
+
+def test_malformed_model_json_is_an_extraction_error():
+    with pytest.raises(ExtractionError):
+        parse_generated_metadata([{"generated_text": '{"title": "x", authors: }'}])
+
+
+@pytest.fixture
+def chunked(monkeypatch):
+    async def no_cache(*args, **kwargs):
+        return None
+
+    async def fake_extract(model, prompt, chunk, count=True):
+        if chunk.startswith("BAD"):
+            return parse_generated_metadata([{"generated_text": "{not json}"}]), False
+        return {"title": chunk[:4]}, False
+
+    monkeypatch.setattr(pdf_chunking.extraction_cache, "get", no_cache)
+    monkeypatch.setattr(pdf_chunking.extraction_cache, "put", no_cache)
+    monkeypatch.setattr(pdf_chunking, "cached_extract_metadata", fake_extract)
+    monkeypatch.setattr(pdf_chunking, "split_text", lambda text: ["GOOD one", "BAD two", "GOOD three"])
+
+
+def test_one_malformed_chunk_does_not_fail_the_document(chunked):
+    metadata, cached = asyncio.run(pdf_chunking.extract_document("m", "p", "text"))
+    assert metadata == {"title": "GOOD"}
+    assert cached is False
+
+
+def test_stream_ends_with_done_line_when_a_chunk_is_malformed(chunked):
+    async def collect():
+        return [json.loads(line) async for line in pdf_chunking.stream_document("m", "p", "text")]
+
+    events = asyncio.run(collect())
+    assert events[-1]["done"] is True
+    assert events[-1]["metadata"] == {"title": "GOOD"}
+    assert sum("error" in e for e in events[:-1]) == 1
@@ -0,0 +1,44 @@
+import asyncio
+
+from app.core.rate_limit import DEFAULT_POLICIES, MemoryStore, RateLimitMiddleware
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def call(middleware, path, method="GET", client=("10.0.0.1", 1234), headers=()):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers), "client": client}
+    asyncio.run(middleware(scope, receive, send))
+    start = messages[0]
+    return start["status"], dict(start["headers"])
+
+
+def test_forum_replies_are_rate_limited():
+    middleware = RateLimitMiddleware(ok_app, store=MemoryStore())
+    policy = next(p for p in DEFAULT_POLICIES if p.matches("GET", "/api/v1/forums/posts/1/replies"))
+
+    statuses = [call(middleware, "/api/v1/forums/posts/1/replies")[0] for _ in range(policy.burst)]
+    assert statuses == [200] * policy.burst
+
+    status, headers = call(middleware, "/api/v1/forums/posts/1/replies")
+    assert status == 429
+    assert int(headers[b"retry-after"]) >= 1
+
+
+def test_spoofed_forwarded_for_is_ignored_by_default():
+    middleware = RateLimitMiddleware(ok_app, store=MemoryStore())
+    for i in range(5):
+        call(middleware, "/api/v1/auth/login", method="POST", headers=[(b"x-forwarded-for", f"1.2.3.{i}".encode())])
+
+    status, _ = call(middleware, "/api/v1/auth/login", method="POST", headers=[(b"x-forwarded-for", b"9.9.9.9")])
+    assert status == 429
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.models import researcher_profile, patient_profile  # noqa: F401  (User relationships)
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services import refresh_tokens
+
+
+def run(tmp_path, scenario):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with Session() as db:
+            user = User(email="a@example.com", hashed_password="x", role=1)
+            db.add(user)
+            await db.commit()
+            token = refresh_tokens.issue_refresh_token(db, user.id)
+            await db.commit()
+        try:
+            return await scenario(Session, token)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_refresh_does_not_revoke_the_winner(tmp_path):
+    async def scenario(Session, token):
+        async with Session() as a, Session() as b:
+            (_, first), (_, second) = await asyncio.gather(
+                refresh_tokens.rotate_refresh_token(a, token),
+                refresh_tokens.rotate_refresh_token(b, token),
+            )
+        async with Session() as db:
+            # both replacements are live and can themselves be rotated
+            await refresh_tokens.rotate_refresh_token(db, first)
+            await refresh_tokens.rotate_refresh_token(db, second)
+
+    run(tmp_path, scenario)
+
+
+def test_reuse_after_grace_window_revokes_the_family(tmp_path, monkeypatch):
+    monkeypatch.setattr(refresh_tokens.settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", 0)
+
+    async def scenario(Session, token):
+        async with Session() as db:
+            _, replacement = await refresh_tokens.rotate_refresh_token(db, token)
+        await asyncio.sleep(0.01)
+        async with Session() as db:
+            with pytest.raises(HTTPException):
+                await refresh_tokens.rotate_refresh_token(db, token)
+        async with Session() as db:
+            with pytest.raises(HTTPException):
+                await refresh_tokens.rotate_refresh_token(db, replacement)
+            live = await db.scalars(select(RefreshToken).where(RefreshToken.revoked_at.is_(None)))
+            assert live.all() == []
+
+    run(tmp_path, scenario)